@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Sweep ChunkingConfig parameters and report the Pareto-optimal settings.
+
+For every combination of target/min/max chunk size and overlap on the grid,
+the articles are re-chunked and indexed in a LocalVectorIndex, then measured:
+
+- chunks and total embedded tokens
+- index size (RAM and on disk)
+- search latency over the evaluation questions
+- recall@k of the questions' expected article sources (by URL)
+
+Embeddings are cached by chunk text, so settings that produce the same
+chunks (and re-runs) don't re-embed them. Settings not beaten on every
+axis by another (higher recall, fewer tokens, smaller index) form the
+Pareto set. Latency is reported but isn't an objective: sub-millisecond
+p50s on a corpus this size are run-to-run noise, and a brute-force scan's
+cost already tracks index size.
+
+Usage:
+    python autotune_chunking.py
+    python autotune_chunking.py --targets 150,300,550 --maxes 250,450,700 --overlaps 0,50,100
+
+Environment variables required:
+    PINECONE_API_KEY (or VITE_PINECONE_API_KEY) - Your Pinecone API key
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Dict, List
+
+import numpy as np
+
+from config import (
+    get_pinecone_config,
+    get_path_config,
+    get_local_index_config,
+    ChunkingConfig,
+    LocalIndexConfig,
+)
+from chunking import TokenCounter
+from corpus import load_article_records, load_evaluation_questions
+from embeddings import EmbeddingCache, PineconeEmbedder
+from load_test_ingestion import percentile
+from local_index import LocalVectorIndex, QUANTIZATIONS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+# Lower is better for every objective except recall
+PARETO_OBJECTIVES = {
+    "recall": 1,
+    "embedded_tokens": -1,
+    "index_bytes": -1,
+}
+
+
+def grid(
+    targets: List[int], mins: List[int], maxes: List[int], overlaps: List[int]
+) -> List[ChunkingConfig]:
+    """Valid combinations (min <= target <= max, overlap < min) of the grid values."""
+    return [
+        ChunkingConfig(
+            target_chunk_size=target,
+            min_chunk_size=min_size,
+            max_chunk_size=max_size,
+            overlap_tokens=overlap,
+        )
+        for target, min_size, max_size, overlap in itertools.product(targets, mins, maxes, overlaps)
+        if min_size <= target <= max_size and overlap < min_size
+    ]
+
+
+def article_recall(hits: List[dict], expected_urls: List[str]) -> float:
+    """Fraction of expected article URLs present among the hits."""
+    found = {hit["fields"].get("url") for hit in hits}
+    return sum(1 for url in expected_urls if url in found) / len(expected_urls)
+
+
+def measure(
+    chunking_config: ChunkingConfig,
+    articles_dir: str,
+    cache: EmbeddingCache,
+    questions: List[dict],
+    query_vectors: List[List[float]],
+    local_config: LocalIndexConfig,
+    quantization: str,
+    top_k: int,
+    repeats: int,
+) -> Dict[str, float]:
+    """Chunk, index and search under one setting."""
+    records = load_article_records(articles_dir, chunking_config)
+    counter = TokenCounter()
+    vectors = cache.embed([record["text"] for record in records])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex.create(tmp, records, vectors, quantization)
+        recalls = []
+        latencies = []
+        for question, vector in zip(questions, query_vectors):
+            for _ in range(repeats):
+                started = time.perf_counter()
+                hits = index.search(
+                    vector, top_k, rescore_multiplier=local_config.rescore_multiplier
+                )
+                latencies.append((time.perf_counter() - started) * 1000.0)
+            expected = [url for url in question["expected_sources"] if "/resources/" in url]
+            recalls.append(article_recall(hits, expected))
+
+        return {
+            **asdict(chunking_config),
+            "chunks": len(records),
+            "embedded_tokens": sum(counter.count(record["text"]) for record in records),
+            "index_bytes": index.memory_bytes(),
+            "disk_bytes": index.disk_bytes(),
+            "latency_p50_ms": percentile(latencies, 50),
+            "latency_p95_ms": percentile(latencies, 95),
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+        }
+
+
+def pareto_front(results: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    """Results not dominated on PARETO_OBJECTIVES by any other result."""
+
+    def dominates(a: dict, b: dict) -> bool:
+        at_least = all(sign * a[key] >= sign * b[key] for key, sign in PARETO_OBJECTIVES.items())
+        better = any(sign * a[key] > sign * b[key] for key, sign in PARETO_OBJECTIVES.items())
+        return at_least and better
+
+    return [r for r in results if not any(dominates(other, r) for other in results)]
+
+
+def _ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main():
+    """Main entry point."""
+    defaults = ChunkingConfig()
+    parser = argparse.ArgumentParser(description="Sweep ChunkingConfig and report the Pareto set")
+    parser.add_argument("--targets", type=_ints, default=[100, 200, 350, defaults.target_chunk_size])
+    parser.add_argument("--mins", type=_ints, default=[50, 150, defaults.min_chunk_size])
+    parser.add_argument("--maxes", type=_ints, default=[150, 300, 500, defaults.max_chunk_size])
+    parser.add_argument("--overlaps", type=_ints, default=[0, 25, defaults.overlap_tokens])
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=None)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20, help="Timed searches per question")
+    parser.add_argument("--output", default=None, help="JSON results path")
+    args = parser.parse_args()
+
+    try:
+        pinecone_config = get_pinecone_config()
+        path_config = get_path_config()
+        local_config = get_local_index_config()
+        quantization = args.quantization or local_config.quantization
+        output = args.output or os.path.join(path_config.local_index_dir, "chunking_sweep.json")
+
+        embedder = PineconeEmbedder(pinecone_config, local_config)
+        cache = EmbeddingCache(
+            embedder, os.path.join(path_config.local_index_dir, "cache", "chunk-embeddings.npz")
+        )
+        questions = [
+            q for q in load_evaluation_questions(path_config)
+            if any("/resources/" in url for url in q["expected_sources"])
+        ]
+        query_vectors = embedder.embed_queries([q["question"] for q in questions])
+
+        settings = grid(args.targets, args.mins, args.maxes, args.overlaps)
+        logger.info(f"Sweeping {len(settings)} chunking settings ({quantization}, recall@{args.top_k})")
+        results = []
+        for i, chunking_config in enumerate(settings, 1):
+            logger.info(
+                f"[{i}/{len(settings)}] target {chunking_config.target_chunk_size}, "
+                f"min {chunking_config.min_chunk_size}, max {chunking_config.max_chunk_size}, "
+                f"overlap {chunking_config.overlap_tokens}"
+            )
+            results.append(measure(
+                chunking_config, path_config.articles_dir, cache, questions, query_vectors,
+                local_config, quantization, args.top_k, args.repeats,
+            ))
+
+        front = sorted(pareto_front(results), key=lambda r: r["index_bytes"])
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "pareto": front}, f, indent=2)
+
+        logger.info("=" * 60)
+        logger.info(f"Pareto-optimal settings ({len(front)} of {len(results)}):")
+        logger.info(
+            f"  {'target':>6} {'min':>5} {'max':>5} {'ovl':>4} {'chunks':>7} "
+            f"{'tokens':>8} {'RAM bytes':>11} {'p50 ms':>7} {'recall':>7}"
+        )
+        for r in front:
+            logger.info(
+                f"  {r['target_chunk_size']:>6} {r['min_chunk_size']:>5} {r['max_chunk_size']:>5} "
+                f"{r['overlap_tokens']:>4} {r['chunks']:>7} {r['embedded_tokens']:>8,} "
+                f"{r['index_bytes']:>11,} {r['latency_p50_ms']:>7.3f} {r['recall']:>7.3f}"
+            )
+        logger.info(f"Full results written to {output}")
+        logger.info("=" * 60)
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
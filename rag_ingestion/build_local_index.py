@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Build local quantized indexes for the articles and threads namespaces.
+
+Embeds every chunk with Pinecone inference (same model as the hosted index),
+caches the embeddings by chunk-text hash, and writes one LocalVectorIndex per
+namespace.
+
+Usage:
+    python build_local_index.py                    # Build with LocalIndexConfig.quantization
+    python build_local_index.py --quantization binary
+    python build_local_index.py --report           # Recall vs memory on the evaluation questions
+
+Environment variables required:
+    PINECONE_API_KEY (or VITE_PINECONE_API_KEY) - Your Pinecone API key
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+
+from config import (
+    get_pinecone_config,
+    get_path_config,
+    get_local_index_config,
+    LocalIndexConfig,
+)
+from corpus import load_corpus_records, load_evaluation_questions
+from embeddings import EmbeddingCache, PineconeEmbedder
+from local_index import LocalVectorIndex, QUANTIZATIONS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def load_or_embed(
+    embedder: PineconeEmbedder, namespace: str, records: List[dict], cache_dir: str
+) -> np.ndarray:
+    """Embed a namespace's records, reusing cached embeddings of unchanged chunk text."""
+    cache = EmbeddingCache(embedder, os.path.join(cache_dir, f"{namespace}-embeddings.npz"))
+    logger.info(f"Embeddings for '{namespace}' ({len(records)} records)...")
+    return cache.embed([record["text"] for record in records])
+
+
+def recall_at_k(hits: List[dict], exact_hits: List[dict]) -> float:
+    """Fraction of the exact top-k ids found in the approximate top-k."""
+    if not exact_hits:
+        return 1.0
+    exact_ids = {hit["_id"] for hit in exact_hits}
+    return len(exact_ids & {hit["_id"] for hit in hits}) / len(exact_ids)
+
+
+def report(
+    corpus: Dict[str, List[dict]],
+    vectors: Dict[str, np.ndarray],
+    query_vectors: List[List[float]],
+    local_config: LocalIndexConfig,
+    top_k: int = 10,
+) -> None:
+    """Log recall@k and memory for every quantization, with and without rescoring."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for namespace, records in corpus.items():
+            indexes = {
+                quantization: LocalVectorIndex.create(
+                    os.path.join(tmp, quantization, namespace),
+                    records,
+                    vectors[namespace],
+                    quantization,
+                )
+                for quantization in QUANTIZATIONS
+            }
+            exact = [indexes["none"].search(q, top_k) for q in query_vectors]
+
+            logger.info("=" * 60)
+            logger.info(f"Namespace '{namespace}' ({len(records)} vectors, recall@{top_k})")
+            logger.info(f"  {'quantization':<12} {'rescore':<8} {'recall':>7} {'RAM bytes':>12}")
+            for quantization, index in indexes.items():
+                modes = [False] if quantization == "none" else [False, True]
+                for rescore in modes:
+                    recalls = [
+                        recall_at_k(
+                            index.search(
+                                q,
+                                top_k,
+                                rescore=rescore,
+                                rescore_multiplier=local_config.rescore_multiplier,
+                            ),
+                            expected,
+                        )
+                        for q, expected in zip(query_vectors, exact)
+                    ]
+                    logger.info(
+                        f"  {quantization:<12} {str(rescore):<8} "
+                        f"{np.mean(recalls):>7.3f} {index.memory_bytes():>12,}"
+                    )
+    logger.info("=" * 60)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=None)
+    parser.add_argument("--report", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        pinecone_config = get_pinecone_config()
+        path_config = get_path_config()
+        local_config = get_local_index_config()
+        quantization = args.quantization or local_config.quantization
+
+        embedder = PineconeEmbedder(pinecone_config, local_config)
+        corpus = load_corpus_records(path_config)
+        cache_dir = os.path.join(path_config.local_index_dir, "cache")
+        vectors = {
+            namespace: load_or_embed(embedder, namespace, records, cache_dir)
+            for namespace, records in corpus.items()
+        }
+
+        if args.report:
+            questions = load_evaluation_questions(path_config)
+            query_vectors = embedder.embed_queries([q["question"] for q in questions])
+            report(corpus, vectors, query_vectors, local_config)
+            return
+
+        for namespace, records in corpus.items():
+            index = LocalVectorIndex.create(
+                os.path.join(path_config.local_index_dir, namespace),
+                records,
+                vectors[namespace],
+                quantization,
+            )
+            logger.info(
+                f"Built '{namespace}' index: {len(index)} vectors, {quantization}, "
+                f"{index.memory_bytes():,} bytes in RAM, {index.disk_bytes():,} bytes on disk"
+            )
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
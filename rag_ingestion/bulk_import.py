@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Full-corpus rebuilds through Pinecone bulk import instead of per-batch upserts.
+
+Two steps:
+1. export: stream the same records the ingesters upsert, embedded with
+   Pinecone inference, into compressed Parquet files laid out for bulk import:
+
+       bulk_export/
+       ├── articles/part-00000.parquet
+       └── threads/part-00000.parquet
+
+   Columns: id (string), values (list<float32>), metadata (JSON string).
+   Each file holds up to `records_per_file` rows in row groups of
+   `records_per_row_group` rows.
+
+2. import: after the export directory is copied to object storage
+   (e.g. `aws s3 sync bulk_export/ s3://bucket/kindred-import/`), start the
+   import into a new index and poll it to completion. Bulk import only
+   supports dense indexes and can't write into existing namespaces, so the
+   target is a new dense serverless index (1024 dims, cosine) named as a
+   new version of the alias (`<alias>-v<UTC timestamp>`, as in
+   rebuild_index.py) unless --index names another new index. The import
+   aborts on the first bad row, then is validated like a rebuild: counts
+   against the local export, and sample questions queried by vector. With
+   --switch, the alias is pointed at the new index once it validates; the
+   retrieval service then embeds queries and searches it by vector. The
+   ingesters can't upsert text records into a dense index, so later
+   incremental ingests need an integrated version (rebuild_index.py).
+
+Usage:
+    python bulk_import.py export
+    python bulk_import.py import --uri s3://bucket/kindred-import/
+    python bulk_import.py import --uri s3://bucket/kindred-import/ --switch
+    python bulk_import.py import --uri s3://bucket/kindred-import/ --index kindred-rag-import
+
+Environment variables:
+    PINECONE_API_KEY (or VITE_PINECONE_API_KEY) - Your Pinecone API key
+    PINECONE_IMPORT_URI - Default import URI (optional)
+    PINECONE_IMPORT_INTEGRATION_ID - Storage integration for private buckets (optional)
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pinecone import Pinecone
+
+from config import (
+    get_pinecone_config,
+    get_path_config,
+    get_bulk_import_config,
+    get_local_index_config,
+    get_rebuild_config,
+    BulkImportConfig,
+    PineconeConfig,
+)
+from corpus import iter_article_records, iter_thread_records, load_evaluation_questions
+from embeddings import PineconeEmbedder
+from index_aliases import AliasRegistry, version_name
+from pinecone_index import create_dense_index
+from rebuild_index import check_sample_queries, wait_for_counts
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+PARQUET_SCHEMA = pa.schema([
+    pa.field("id", pa.string(), nullable=False),
+    pa.field("values", pa.list_(pa.float32()), nullable=False),
+    pa.field("metadata", pa.string()),
+])
+
+TERMINAL_IMPORT_STATES = ("Completed", "Failed", "Cancelled")
+
+
+def to_import_row(record: dict, vector: List[float]) -> dict:
+    """Convert an upsert record and its embedding to a bulk-import row."""
+    metadata = {k: v for k, v in record.items() if k != "_id"}
+    return {
+        "id": record["_id"],
+        "values": vector,
+        "metadata": json.dumps(metadata),
+    }
+
+
+class ParquetExporter:
+    """Writes bulk-import rows to partitioned Parquet files, one directory per namespace."""
+
+    def __init__(self, export_dir: str, config: BulkImportConfig):
+        self.export_dir = export_dir
+        self.config = config
+
+    def write_namespace(self, namespace: str, rows: Iterable[dict]) -> int:
+        """
+        Stream rows into `<export_dir>/<namespace>/part-NNNNN.parquet`.
+
+        Rows are buffered one row group at a time, so memory stays bounded
+        regardless of corpus size.
+
+        Returns:
+            Number of rows written
+        """
+        namespace_dir = os.path.join(self.export_dir, namespace)
+        os.makedirs(namespace_dir, exist_ok=True)
+        for stale in os.listdir(namespace_dir):
+            if stale.endswith(".parquet"):
+                os.remove(os.path.join(namespace_dir, stale))
+
+        writer: Optional[pq.ParquetWriter] = None
+        file_index = 0
+        rows_in_file = 0
+        total = 0
+        buffer: List[dict] = []
+
+        def flush():
+            nonlocal writer, file_index, rows_in_file
+            if not buffer:
+                return
+            if writer is None:
+                path = os.path.join(namespace_dir, f"part-{file_index:05d}.parquet")
+                writer = pq.ParquetWriter(path, PARQUET_SCHEMA, compression=self.config.compression)
+            writer.write_table(pa.Table.from_pylist(buffer, schema=PARQUET_SCHEMA))
+            rows_in_file += len(buffer)
+            buffer.clear()
+            if rows_in_file >= self.config.records_per_file:
+                writer.close()
+                writer = None
+                file_index += 1
+                rows_in_file = 0
+
+        try:
+            for row in rows:
+                buffer.append(row)
+                total += 1
+                if len(buffer) >= self.config.records_per_row_group or \
+                        rows_in_file + len(buffer) >= self.config.records_per_file:
+                    flush()
+            flush()
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info(f"Exported {total} rows for namespace '{namespace}' to {namespace_dir}")
+        return total
+
+
+def embedded_rows(
+    embedder: PineconeEmbedder, records: Iterable[dict], batch_size: int
+) -> Iterator[dict]:
+    """Embed records batch by batch and yield bulk-import rows."""
+    batch: List[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from _embed_batch(embedder, batch)
+            batch = []
+    if batch:
+        yield from _embed_batch(embedder, batch)
+
+
+def _embed_batch(embedder: PineconeEmbedder, batch: List[dict]) -> Iterator[dict]:
+    vectors = embedder.embed_passages([record["text"] for record in batch])
+    for record, vector in zip(batch, vectors):
+        yield to_import_row(record, vector)
+
+
+def export(pinecone_config: PineconeConfig) -> Dict[str, int]:
+    """Export the whole corpus to Parquet, returning rows written per namespace."""
+    namespaces = {
+        "articles": pinecone_config.articles_namespace,
+        "threads": pinecone_config.threads_namespace,
+    }
+    path_config = get_path_config()
+    local_config = get_local_index_config()
+    exporter = ParquetExporter(path_config.export_dir, get_bulk_import_config())
+    embedder = PineconeEmbedder(pinecone_config, local_config)
+
+    # Records stream file by file into each Parquet row group; the corpus is never held whole
+    records = {
+        "articles": iter_article_records(path_config.articles_dir),
+        "threads": iter_thread_records(path_config.threads_dir),
+    }
+    return {
+        namespaces[key]: exporter.write_namespace(
+            namespaces[key],
+            embedded_rows(embedder, stream, local_config.embed_batch_size),
+        )
+        for key, stream in records.items()
+    }
+
+
+def exported_counts(export_dir: str) -> Dict[str, int]:
+    """Rows per namespace in a local export, read from the Parquet footers."""
+    counts = {}
+    for namespace in sorted(os.listdir(export_dir)):
+        namespace_dir = os.path.join(export_dir, namespace)
+        if not os.path.isdir(namespace_dir):
+            continue
+        counts[namespace] = sum(
+            pq.ParquetFile(os.path.join(namespace_dir, name)).metadata.num_rows
+            for name in os.listdir(namespace_dir)
+            if name.endswith(".parquet")
+        )
+    if not counts:
+        raise FileNotFoundError(f"No exported namespaces in {export_dir}; run the export first")
+    return counts
+
+
+def run_import(
+    uri: str,
+    config: BulkImportConfig,
+    pinecone_config: PineconeConfig,
+    index_name: str,
+    expected: Dict[str, int],
+) -> dict:
+    """
+    Bulk-import into a new dense index, wait for it to finish and validate it.
+
+    Validation matches rebuild_index.py: the imported count and per-namespace
+    stats must equal the export, and sample evaluation questions (embedded
+    with Pinecone inference) must return hits from every namespace.
+
+    Args:
+        uri: Object-storage prefix holding one subdirectory per namespace
+        config: Bulk import settings (error mode, polling)
+        pinecone_config: Cloud, region and dimension for the new index
+        index_name: Physical index to create and import into
+        expected: Exported rows per namespace
+
+    Returns:
+        Import ID, index name and records imported
+    """
+    pc = Pinecone(api_key=pinecone_config.api_key, host=pinecone_config.controller_host)
+    # Bulk import only supports dense indexes: the rows carry their own vectors
+    index = create_dense_index(pc, pinecone_config, index_name)
+
+    response = index.start_import(
+        uri=uri, integration_id=config.integration_id, error_mode=config.error_mode
+    )
+    logger.info(f"Started import {response.id} from {uri} into '{index_name}'")
+
+    while True:
+        status = index.describe_import(id=response.id)
+        logger.info(
+            f"Import {response.id}: {status.status} "
+            f"({getattr(status, 'percent_complete', 0) or 0:.0f}% complete, "
+            f"{getattr(status, 'records_imported', 0) or 0} records)"
+        )
+        if status.status in TERMINAL_IMPORT_STATES:
+            break
+        time.sleep(config.poll_interval_s)
+
+    if status.status != "Completed":
+        raise RuntimeError(
+            f"Import {response.id} ended as {status.status}: {getattr(status, 'error', '')}"
+        )
+
+    records_imported = getattr(status, "records_imported", 0) or 0
+    problems = []
+    if records_imported != sum(expected.values()):
+        problems.append(f"imported {records_imported} records, exported {sum(expected.values())}")
+    problems += wait_for_counts(index, expected, config.count_timeout_s)
+    if not problems:
+        questions = [
+            q["question"] for q in load_evaluation_questions()[: get_rebuild_config().sample_queries]
+        ]
+        query_vectors = PineconeEmbedder(pinecone_config).embed_queries(questions)
+        problems = check_sample_queries(index, list(expected), questions, query_vectors)
+    if problems:
+        raise RuntimeError(f"Import {response.id} into '{index_name}' is incomplete: {'; '.join(problems)}")
+    return {"import_id": response.id, "index": index_name, "records_imported": records_imported}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Parquet export and Pinecone bulk import")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("export", help="Write the corpus to bulk-import Parquet files")
+    import_parser = subcommands.add_parser("import", help="Start a bulk import and wait for it")
+    import_parser.add_argument("--uri", default=None, help="Defaults to PINECONE_IMPORT_URI")
+    import_parser.add_argument(
+        "--index", default=None, help="New index to create and import into (default: a new version of the alias)"
+    )
+    import_parser.add_argument(
+        "--switch", action="store_true", help="Point the alias at the imported index"
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            counts = export(get_pinecone_config())
+            logger.info(f"Export complete: {counts}")
+            logger.info("Copy the export directory to object storage, then run: python bulk_import.py import --uri <uri>")
+        else:
+            config = get_bulk_import_config()
+            uri = args.uri or config.import_uri
+            if not uri:
+                raise EnvironmentError("An import URI is required (--uri or PINECONE_IMPORT_URI)")
+            pinecone_config = get_pinecone_config()
+            index_name = args.index or version_name(pinecone_config.index_alias)
+            expected = exported_counts(get_path_config().export_dir)
+            summary = run_import(uri, config, pinecone_config, index_name, expected)
+            logger.info(f"Import complete: {summary}")
+            if args.switch:
+                registry = AliasRegistry(pinecone_config.alias_registry_path)
+                previous = registry.switch(pinecone_config.index_alias, index_name)
+                logger.info(
+                    f"Alias '{pinecone_config.index_alias}' now points at '{index_name}' "
+                    f"(was '{previous or pinecone_config.index_alias}')"
+                )
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
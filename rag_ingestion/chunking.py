@@ -9,7 +9,7 @@ Provides intelligent chunking strategies for:
 import re
 import hashlib
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import tiktoken
 
 from config import ChunkingConfig, get_chunking_config
@@ -25,6 +25,43 @@ class ArticleChunk:
     filename: str
     section: str
     token_count: int
+    section_index: int = 0  # Position of the section within the article
+    chunk_index: int = 0  # Position of the chunk within its section
+    parent_id: str = ""  # Parent section ID (hierarchical mode only)
+
+    def to_record(self) -> dict:
+        """
+        Build the record upserted to Pinecone.
+
+        All fields except _id and text are treated as metadata.
+        """
+        record = {
+            "_id": self.chunk_id,
+            "text": self.text,  # Pinecone embeds this automatically
+            "type": "article",
+            "title": self.title,
+            "url": self.url,
+            "filename": self.filename,
+            "section": self.section,
+            "section_index": self.section_index,
+            "chunk_index": self.chunk_index,
+        }
+        if self.parent_id:
+            record["parent_id"] = self.parent_id
+        return record
+
+
+@dataclass
+class ParentSection:
+    """A full article section, stored once in the local docstore (hierarchical mode)."""
+    parent_id: str
+    text: str
+    title: str
+    url: str
+    filename: str
+    section: str
+    section_index: int
+    token_count: int
 
 
 @dataclass
@@ -39,6 +76,23 @@ class ThreadPostChunk:
     post_id: str
     token_count: int
 
+    def to_record(self) -> dict:
+        """
+        Build the record upserted to Pinecone.
+
+        All fields except _id and text are treated as metadata.
+        """
+        return {
+            "_id": self.chunk_id,
+            "text": self.text,  # Pinecone embeds this automatically
+            "type": "thread",
+            "thread_id": self.thread_id,
+            "url": self.url,
+            "author": self.author,
+            "timestamp": self.timestamp,
+            "post_id": self.post_id,
+        }
+
 
 class TokenCounter:
     """Utility for counting tokens using tiktoken."""
@@ -66,13 +120,17 @@ class ArticleChunker:
     Strategy:
     1. Parse markdown to identify sections (## headers)
     2. Chunk each section independently
-    3. If a section exceeds max size, split with overlap
+    3. If a section exceeds max size, split with overlap near the target size
     4. Preserve section heading in metadata
     """
     
-    def __init__(self, config: Optional[ChunkingConfig] = None):
+    def __init__(
+        self,
+        config: Optional[ChunkingConfig] = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
         self.config = config or get_chunking_config()
-        self.token_counter = TokenCounter()
+        self.token_counter = token_counter or TokenCounter()
     
     def chunk_article(
         self,
@@ -96,7 +154,7 @@ class ArticleChunker:
         chunks = []
         sections = self._parse_sections(content)
         
-        for section_heading, section_text in sections:
+        for section_index, (section_heading, section_text) in enumerate(sections):
             section_chunks = self._chunk_section(
                 section_text,
                 section_heading,
@@ -104,10 +162,91 @@ class ArticleChunker:
                 url,
                 filename,
             )
+            for chunk in section_chunks:
+                chunk.section_index = section_index
             chunks.extend(section_chunks)
         
         return chunks
     
+    def chunk_article_hierarchical(
+        self,
+        content: str,
+        title: str,
+        url: str,
+        filename: str,
+    ) -> Tuple[List[ArticleChunk], List[ParentSection]]:
+        """
+        Chunk an article into small child chunks that point at their parent section.
+        
+        Children are paragraph groups of up to `child_chunk_size` tokens
+        (paragraphs longer than that are split into sentence groups) and are
+        what gets embedded. Each full section becomes one ParentSection.
+        
+        Returns:
+            (child chunks, parent sections)
+        """
+        children = []
+        parents = []
+        sections = self._parse_sections(content)
+        
+        for section_index, (section_heading, section_text) in enumerate(sections):
+            parent_id = self._generate_parent_id(filename, section_heading, section_index)
+            parents.append(ParentSection(
+                parent_id=parent_id,
+                text=section_text,
+                title=title,
+                url=url,
+                filename=filename,
+                section=section_heading,
+                section_index=section_index,
+                token_count=self.token_counter.count(section_text),
+            ))
+            
+            for chunk_index, child_text in enumerate(self._child_texts(section_text)):
+                children.append(ArticleChunk(
+                    chunk_id=self._generate_chunk_id(filename, parent_id, chunk_index),
+                    text=child_text,
+                    title=title,
+                    url=url,
+                    filename=filename,
+                    section=section_heading,
+                    token_count=self.token_counter.count(child_text),
+                    section_index=section_index,
+                    chunk_index=chunk_index,
+                    parent_id=parent_id,
+                ))
+        
+        return children, parents
+    
+    def _child_texts(self, text: str) -> List[str]:
+        """Group paragraphs (or sentences of long paragraphs) into child-sized pieces."""
+        limit = self.config.child_chunk_size
+        units = []
+        for para in text.split('\n\n'):
+            para = para.strip()
+            if not para:
+                continue
+            if self.token_counter.count(para) <= limit:
+                units.append(para)
+            else:
+                units.extend(s for s in re.split(r'(?<=[.!?])\s+', para) if s)
+        
+        groups = []
+        current = []
+        current_tokens = 0
+        for unit in units:
+            unit_tokens = self.token_counter.count(unit)
+            if current and current_tokens + unit_tokens > limit:
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(unit)
+            current_tokens += unit_tokens
+        if current:
+            groups.append(current)
+        
+        return ['\n\n'.join(group) for group in groups]
+    
     def _parse_sections(self, content: str) -> List[tuple]:
         """
         Parse markdown into sections based on ## headers.
@@ -173,71 +312,82 @@ class ArticleChunker:
             ))
             return chunks
         
-        # Split into multiple chunks with overlap
-        paragraphs = text.split('\n\n')
+        # Split into multiple chunks with overlap. A chunk closes at a paragraph
+        # boundary once it reaches target_chunk_size, or before it would exceed
+        # max_chunk_size. A trailing chunk under min_chunk_size is folded into
+        # the previous one if the result still fits in max_chunk_size.
+        paragraphs = [para.strip() for para in text.split('\n\n') if para.strip()]
+        groups = []
         current_chunk_text = []
         current_token_count = 0
-        chunk_index = 0
+        carried = 0  # Leading paragraphs of current_chunk_text that are overlap
         
         for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-                
             para_tokens = self.token_counter.count(para)
             
             # If adding this paragraph exceeds max, save current chunk
-            if current_token_count + para_tokens > self.config.max_chunk_size and current_chunk_text:
-                chunk_text = '\n\n'.join(current_chunk_text)
-                chunk_id = self._generate_chunk_id(filename, section_heading, chunk_index)
-                chunks.append(ArticleChunk(
-                    chunk_id=chunk_id,
-                    text=chunk_text,
-                    title=title,
-                    url=url,
-                    filename=filename,
-                    section=section_heading,
-                    token_count=self.token_counter.count(chunk_text),
-                ))
-                chunk_index += 1
-                
-                # Keep overlap - take last paragraph(s) up to overlap_tokens
-                overlap_text = []
-                overlap_tokens = 0
-                for prev_para in reversed(current_chunk_text):
-                    prev_tokens = self.token_counter.count(prev_para)
-                    if overlap_tokens + prev_tokens <= self.config.overlap_tokens:
-                        overlap_text.insert(0, prev_para)
-                        overlap_tokens += prev_tokens
-                    else:
-                        break
-                
-                current_chunk_text = overlap_text
-                current_token_count = overlap_tokens
+            if current_token_count + para_tokens > self.config.max_chunk_size and len(current_chunk_text) > carried:
+                groups.append(current_chunk_text)
+                current_chunk_text, current_token_count = self._overlap(current_chunk_text)
+                carried = len(current_chunk_text)
             
             current_chunk_text.append(para)
             current_token_count += para_tokens
+            
+            if current_token_count >= self.config.target_chunk_size:
+                groups.append(current_chunk_text)
+                current_chunk_text, current_token_count = self._overlap(current_chunk_text)
+                carried = len(current_chunk_text)
         
         # Don't forget the last chunk
-        if current_chunk_text:
-            chunk_text = '\n\n'.join(current_chunk_text)
-            chunk_id = self._generate_chunk_id(filename, section_heading, chunk_index)
+        tail = current_chunk_text[carried:]
+        if tail:
+            merged = groups[-1] + tail if groups else None
+            if (
+                merged is not None
+                and self.token_counter.count('\n\n'.join(tail)) < self.config.min_chunk_size
+                and self.token_counter.count('\n\n'.join(merged)) <= self.config.max_chunk_size
+            ):
+                groups[-1] = merged
+            else:
+                groups.append(current_chunk_text)
+        
+        for chunk_index, group in enumerate(groups):
+            chunk_text = '\n\n'.join(group)
             chunks.append(ArticleChunk(
-                chunk_id=chunk_id,
+                chunk_id=self._generate_chunk_id(filename, section_heading, chunk_index),
                 text=chunk_text,
                 title=title,
                 url=url,
                 filename=filename,
                 section=section_heading,
                 token_count=self.token_counter.count(chunk_text),
+                chunk_index=chunk_index,
             ))
         
         return chunks
     
+    def _overlap(self, paragraphs: List[str]) -> Tuple[List[str], int]:
+        """Last paragraph(s) of a chunk, up to overlap_tokens, to start the next one."""
+        overlap_text = []
+        overlap_tokens = 0
+        for prev_para in reversed(paragraphs):
+            prev_tokens = self.token_counter.count(prev_para)
+            if overlap_tokens + prev_tokens > self.config.overlap_tokens:
+                break
+            overlap_text.insert(0, prev_para)
+            overlap_tokens += prev_tokens
+        return overlap_text, overlap_tokens
+    
     def _generate_chunk_id(self, filename: str, section: str, index: int) -> str:
         """Generate a unique, deterministic chunk ID."""
         content = f"{filename}:{section}:{index}"
         return hashlib.md5(content.encode()).hexdigest()[:16]
+    
+    def _generate_parent_id(self, filename: str, section: str, section_index: int) -> str:
+        """Generate a unique, deterministic parent section ID."""
+        content = f"{filename}:{section_index}:{section}:parent"
+        return hashlib.md5(content.encode()).hexdigest()[:16]
 
 
 class ThreadChunker:
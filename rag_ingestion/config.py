@@ -7,10 +7,12 @@ Uses Pinecone's integrated embedding - no external embedding API needed!
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from dotenv import load_dotenv
 
+from index_aliases import AliasRegistry, is_version_of
+
 # Load .env.local from project root
 _project_root = Path(__file__).parent.parent
 _env_file = _project_root / ".env.local"
@@ -20,16 +22,28 @@ else:
     # Fall back to .env
     load_dotenv(_project_root / ".env")
 
+# Outside the working tree, so a fresh checkout or `git clean` can't lose it
+DEFAULT_ALIAS_REGISTRY = str(
+    Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+    / "kindred-rag" / "index_aliases.json"
+)
+
 
 @dataclass
 class PineconeConfig:
     """Pinecone configuration with integrated embedding."""
     api_key: str
-    index_name: str = "kindred-rag"  # New index with integrated embedding
+    # Readers resolve this alias to the live versioned index through the
+    # alias registry; an unregistered alias is used as the index name itself
+    # only while no versioned indexes exist (see resolve_index_name)
+    index_alias: str = "kindred-rag"
+    index_version: Optional[str] = None  # Pin a physical index (rebuilds write here)
+    alias_registry_path: str = DEFAULT_ALIAS_REGISTRY
     
     # Pinecone's hosted embedding model (integrated inference)
     # See: https://docs.pinecone.io/guides/index-data/create-an-index#embedding-models
     embedding_model: str = "multilingual-e5-large"  # 1024 dimensions, good for English
+    dimension: int = 1024  # Dense (bulk-imported) indexes store the model's vectors directly
     
     # Cloud/region for serverless
     cloud: str = "aws"
@@ -38,6 +52,36 @@ class PineconeConfig:
     # Namespaces
     articles_namespace: str = "articles"
     threads_namespace: str = "threads"
+    
+    # Control plane URL override, e.g. a local stand-in (None uses Pinecone's API)
+    controller_host: Optional[str] = None
+
+    @property
+    def index_name(self) -> str:
+        """Physical index to use: the pinned version, else the alias's current target."""
+        if self.index_version:
+            return self.index_version
+        return AliasRegistry(self.alias_registry_path).resolve(self.index_alias) or self.index_alias
+
+    def resolve_index_name(self, existing_indexes: List[str]) -> str:
+        """
+        index_name, checked against the indexes that exist.
+
+        Raises:
+            EnvironmentError: The alias isn't in the registry but versioned
+                indexes for it exist, i.e. the registry is missing or lost
+        """
+        index_name = self.index_name
+        if index_name != self.index_alias:
+            return index_name
+        versions = sorted(name for name in existing_indexes if is_version_of(self.index_alias, name))
+        if versions:
+            raise EnvironmentError(
+                f"Alias '{self.index_alias}' isn't in the alias registry "
+                f"({self.alias_registry_path}) but versioned indexes exist: {', '.join(versions)}. "
+                "Restore the registry or set PINECONE_ALIAS_REGISTRY to the shared one"
+            )
+        return index_name
 
 
 @dataclass
@@ -47,6 +91,67 @@ class ChunkingConfig:
     min_chunk_size: int = 400
     max_chunk_size: int = 700
     overlap_tokens: int = 100
+    
+    # "flat" embeds 400-700 token chunks; "hierarchical" embeds small child
+    # chunks and keeps full sections in the local docstore
+    mode: str = "flat"
+    child_chunk_size: int = 120
+
+
+@dataclass
+class LocalIndexConfig:
+    """Configuration for the local quantized vector index."""
+    quantization: str = "int8"  # "none", "int8" or "binary"
+    rescore_multiplier: int = 4  # Candidates rescored against float vectors = top_k * multiplier
+    embed_batch_size: int = 96  # Max inputs per Pinecone inference request
+
+
+@dataclass
+class BulkImportConfig:
+    """Configuration for Parquet export and Pinecone bulk import."""
+    records_per_row_group: int = 1000
+    records_per_file: int = 100_000
+    compression: str = "zstd"
+    import_uri: Optional[str] = None  # e.g. s3://bucket/kindred-import/ (one subdirectory per namespace)
+    integration_id: Optional[str] = None  # Storage integration for private buckets
+    error_mode: str = "ABORT"  # or "CONTINUE" to skip bad rows
+    poll_interval_s: float = 30.0
+    count_timeout_s: float = 300.0  # Wait for imported counts to show in index stats
+
+
+@dataclass
+class ServiceConfig:
+    """Configuration for the async retrieval service."""
+    host: str = "127.0.0.1"
+    port: int = 8080
+    backend: str = "pinecone"  # "pinecone" (hosted index) or "local" (LocalVectorIndex)
+    max_connections: int = 100  # Pooled connections to the vector backend
+    default_top_k: int = 5
+    max_top_k: int = 100
+    default_token_budget: int = 2000
+    max_token_budget: int = 32000
+    cache_ttl_s: float = 30.0  # 0 disables the response cache
+    cache_size: int = 1024
+    api_version: str = "2025-01"  # Pinecone REST API version header
+    route_queries: bool = False  # Use the query router when requests don't name namespaces
+    alias_refresh_s: float = 10.0  # How often to re-resolve the index alias
+
+
+@dataclass
+class RouterConfig:
+    """Configuration for the local query router."""
+    # Minimum share to search only one namespace; `query_router.py` raises it
+    # above every evaluation question that would lose an expected namespace
+    single_namespace_share: float = 0.85
+    cue_weight: float = 0.15  # Share moved toward a namespace per matched cue phrase
+
+
+@dataclass
+class RebuildConfig:
+    """Configuration for shadow-index rebuilds."""
+    sample_queries: int = 5  # Evaluation questions searched against the new version
+    count_timeout_s: float = 300.0  # Wait for record counts to settle
+    gc_grace_s: float = 60.0  # Delay before deleting the old version, for in-flight readers
 
 
 @dataclass
@@ -54,6 +159,15 @@ class PathConfig:
     """File path configuration."""
     articles_dir: str = "kindred-dataset/articles"
     threads_dir: str = "kindred-dataset/community-threads"
+    evaluation_questions: str = "kindred-dataset/evaluation-questions.json"
+    local_index_dir: str = "rag_ingestion/local_index"
+    export_dir: str = "rag_ingestion/bulk_export"
+    docstore_dir: str = "rag_ingestion/docstore"
+    router_path: str = "rag_ingestion/local_index/query_router.json"
+
+    def docstore_path(self, index_name: str) -> str:
+        """Parent-section docstore for one physical index version."""
+        return os.path.join(self.docstore_dir, f"{index_name}.sqlite")
 
 
 def get_pinecone_config() -> PineconeConfig:
@@ -65,12 +179,54 @@ def get_pinecone_config() -> PineconeConfig:
             "PINECONE_API_KEY (or VITE_PINECONE_API_KEY) environment variable is required. "
             "Set it in .env.local or export it."
         )
-    return PineconeConfig(api_key=api_key)
+    return PineconeConfig(
+        api_key=api_key,
+        controller_host=os.environ.get("PINECONE_CONTROLLER_HOST") or None,
+        alias_registry_path=os.environ.get("PINECONE_ALIAS_REGISTRY") or DEFAULT_ALIAS_REGISTRY,
+    )
 
 
 def get_chunking_config() -> ChunkingConfig:
-    """Get chunking configuration."""
-    return ChunkingConfig()
+    """Get chunking configuration (CHUNKING_MODE selects flat or hierarchical)."""
+    mode = os.environ.get("CHUNKING_MODE", "flat")
+    if mode not in ("flat", "hierarchical"):
+        raise EnvironmentError(
+            f"Unknown CHUNKING_MODE '{mode}'. Expected 'flat' or 'hierarchical'"
+        )
+    return ChunkingConfig(mode=mode)
+
+
+def get_local_index_config() -> LocalIndexConfig:
+    """Get local index configuration."""
+    return LocalIndexConfig()
+
+
+def get_bulk_import_config() -> BulkImportConfig:
+    """Get bulk import configuration from environment variables."""
+    return BulkImportConfig(
+        import_uri=os.environ.get("PINECONE_IMPORT_URI") or None,
+        integration_id=os.environ.get("PINECONE_IMPORT_INTEGRATION_ID") or None,
+    )
+
+
+def get_service_config() -> ServiceConfig:
+    """Get retrieval service configuration from environment variables."""
+    return ServiceConfig(
+        host=os.environ.get("RETRIEVAL_SERVICE_HOST", "127.0.0.1"),
+        port=int(os.environ.get("RETRIEVAL_SERVICE_PORT", "8080")),
+        backend=os.environ.get("RETRIEVAL_BACKEND", "pinecone"),
+        route_queries=os.environ.get("RETRIEVAL_ROUTE_QUERIES", "").lower() in ("1", "true", "yes"),
+    )
+
+
+def get_router_config() -> RouterConfig:
+    """Get query router configuration."""
+    return RouterConfig()
+
+
+def get_rebuild_config() -> RebuildConfig:
+    """Get shadow-index rebuild configuration."""
+    return RebuildConfig()
 
 
 def get_path_config(base_dir: Optional[str] = None) -> PathConfig:
@@ -87,4 +243,9 @@ def get_path_config(base_dir: Optional[str] = None) -> PathConfig:
     return PathConfig(
         articles_dir=os.path.join(base_dir, "kindred-dataset", "articles"),
         threads_dir=os.path.join(base_dir, "kindred-dataset", "community-threads"),
+        evaluation_questions=os.path.join(base_dir, "kindred-dataset", "evaluation-questions.json"),
+        local_index_dir=os.path.join(base_dir, "rag_ingestion", "local_index"),
+        export_dir=os.path.join(base_dir, "rag_ingestion", "bulk_export"),
+        docstore_dir=os.path.join(base_dir, "rag_ingestion", "docstore"),
+        router_path=os.path.join(base_dir, "rag_ingestion", "local_index", "query_router.json"),
     )
@@ -0,0 +1,286 @@
+"""
+Token-budgeted context assembly for the Kindred RAG pipeline.
+
+Turns retrieved chunks into a compact prompt context:
+- Reorders chunks by their position in the source article or thread
+- Merges adjacent chunks from the same section and drops overlapping paragraphs
+- Drops thread paragraphs that only repeat (quote) earlier posts
+- Packs the result into a token budget using TokenCounter
+- Keeps citation metadata (url, section, post_id) for every span
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from chunking import TokenCounter
+
+
+@dataclass
+class ContextSpan:
+    """A contiguous piece of source text kept in the assembled context."""
+    text: str
+    type: str
+    url: str
+    section: str = ""
+    post_id: str = ""
+    title: str = ""
+    thread_id: str = ""
+    author: str = ""
+    score: float = 0.0
+    token_count: int = 0
+    chunk_ids: List[str] = field(default_factory=list)
+    position: tuple = ()  # Sort key for the span's position within its source
+
+    def citation(self) -> dict:
+        """Citation metadata for this span."""
+        return {
+            "url": self.url,
+            "section": self.section,
+            "post_id": self.post_id,
+        }
+
+
+@dataclass
+class AssembledContext:
+    """Result of assembling retrieved chunks into a prompt context."""
+    spans: List[ContextSpan]
+    total_tokens: int
+    token_budget: int
+    dropped_chunk_ids: List[str] = field(default_factory=list)
+
+    @property
+    def citations(self) -> List[dict]:
+        """Citation metadata for each kept span, in prompt order."""
+        return [span.citation() for span in self.spans]
+
+    def to_prompt(self) -> str:
+        """Render the spans as numbered, citable blocks."""
+        return "\n\n".join(
+            ContextAssembler.render_span(span, i + 1) for i, span in enumerate(self.spans)
+        )
+
+
+def _hit_fields(hit: dict) -> dict:
+    """
+    Flatten a search hit into a single dict of fields.
+
+    Accepts Pinecone `search` hits ({"_id", "_score", "fields": {...}}) as well
+    as flat records shaped like the ones the ingesters upsert.
+    """
+    fields = dict(hit.get("fields") or {})
+    for key, value in hit.items():
+        if key != "fields":
+            fields.setdefault(key, value)
+    return fields
+
+
+def _normalize(paragraph: str) -> str:
+    """Normalize a paragraph for duplicate detection."""
+    return re.sub(r"\s+", " ", paragraph).strip().lower()
+
+
+def _strip_quote(paragraph: str) -> str:
+    """Remove markdown quote markers ("> ") from every line of a paragraph."""
+    return "\n".join(re.sub(r"^\s*>\s?", "", line) for line in paragraph.split("\n"))
+
+
+class ContextAssembler:
+    """
+    Assembles retrieved chunks into a token-budgeted, citation-aware context.
+
+    Strategy:
+    1. Group hits by source (article section or thread)
+    2. Order each group by source position and drop repeated paragraphs
+       (chunk overlap for articles, quoted text for threads)
+    3. Rank the resulting spans by retrieval score
+    4. Greedily pack spans into the token budget, truncating the last one
+       only if at least `min_span_tokens` remain
+    """
+
+    def __init__(
+        self,
+        token_counter: Optional[TokenCounter] = None,
+        min_span_tokens: int = 50,
+    ):
+        self.token_counter = token_counter or TokenCounter()
+        self.min_span_tokens = min_span_tokens
+
+    def assemble(self, hits: List[dict], token_budget: int) -> AssembledContext:
+        """
+        Assemble retrieved hits into a context that fits `token_budget`.
+
+        Args:
+            hits: Search hits or records with the metadata written by the ingesters
+            token_budget: Maximum number of tokens for the rendered context
+
+        Returns:
+            AssembledContext with the kept spans and their citations
+        """
+        groups: Dict[tuple, List[dict]] = {}
+        for hit in hits:
+            fields = _hit_fields(hit)
+            groups.setdefault(self._group_key(fields), []).append(fields)
+
+        spans = []
+        for records in groups.values():
+            records.sort(key=self._position_key)
+            if records[0].get("type") == "thread":
+                spans.extend(self._merge_thread(records))
+            else:
+                spans.extend(self._merge_section(records))
+
+        spans = [span for span in spans if span.text]
+        spans.sort(key=lambda span: -span.score)
+        kept, dropped, total_tokens = self._pack(spans, token_budget)
+
+        # Present kept spans in source order so the prompt reads naturally. Thread
+        # and article positions have different element types, so the type goes
+        # first within a URL (records without a url all share "")
+        kept.sort(key=lambda span: (span.url, span.type, span.position))
+        context = AssembledContext(
+            spans=kept,
+            total_tokens=total_tokens,
+            token_budget=token_budget,
+            dropped_chunk_ids=dropped,
+        )
+
+        # Tokens can merge across block boundaries, so check the rendered
+        # prompt itself and drop the weakest spans until it fits
+        total_tokens = self.token_counter.count(context.to_prompt())
+        while context.spans and total_tokens > token_budget:
+            weakest = min(context.spans, key=lambda span: span.score)
+            context.spans.remove(weakest)
+            context.dropped_chunk_ids.extend(weakest.chunk_ids)
+            total_tokens = self.token_counter.count(context.to_prompt())
+        context.total_tokens = total_tokens
+        return context
+
+    @staticmethod
+    def render_span(span: ContextSpan, number: int) -> str:
+        """Render a span with a numbered citation header."""
+        if span.type == "thread":
+            header = f"[{number}] {span.author} in community thread {span.thread_id} ({span.url})"
+        else:
+            header = f"[{number}] {span.title} - {span.section} ({span.url})"
+        return f"{header}\n{span.text}"
+
+    def _group_key(self, fields: dict) -> tuple:
+        """Group article chunks by section and thread posts by thread."""
+        if fields.get("type") == "thread":
+            return ("thread", fields.get("thread_id") or fields.get("url", ""))
+        return (
+            "article",
+            fields.get("filename") or fields.get("url", ""),
+            fields.get("section", ""),
+        )
+
+    def _position_key(self, fields: dict) -> tuple:
+        """Sort key giving a record's position in its source: (str, str) for
+        thread posts, (int, int) for article chunks."""
+        if fields.get("type") == "thread":
+            return (str(fields.get("timestamp") or ""), str(fields.get("post_id") or ""))
+        return (int(fields.get("section_index") or 0), int(fields.get("chunk_index") or 0))
+
+    def _merge_section(self, records: List[dict]) -> List[ContextSpan]:
+        """
+        Merge chunks from one article section.
+
+        Adjacent chunks (consecutive chunk_index) become a single span with the
+        overlapping paragraphs removed; non-adjacent chunks stay separate spans.
+        """
+        spans: List[ContextSpan] = []
+        seen = set()
+        previous_index = None
+
+        for record in records:
+            chunk_index = int(record.get("chunk_index", 0))
+            paragraphs = []
+            for para in record.get("text", "").split("\n\n"):
+                key = _normalize(para)
+                if key and key not in seen:
+                    seen.add(key)
+                    paragraphs.append(para.strip())
+
+            if spans and previous_index is not None and chunk_index == previous_index + 1:
+                span = spans[-1]
+                span.text = "\n\n".join(p for p in [span.text] + paragraphs if p)
+                span.score = max(span.score, float(record.get("_score", 0.0)))
+                span.chunk_ids.append(record.get("_id", ""))
+            else:
+                spans.append(ContextSpan(
+                    text="\n\n".join(paragraphs),
+                    type="article",
+                    url=record.get("url", ""),
+                    section=record.get("section", ""),
+                    title=record.get("title", ""),
+                    score=float(record.get("_score", 0.0)),
+                    chunk_ids=[record.get("_id", "")],
+                    position=self._position_key(record),
+                ))
+            previous_index = chunk_index
+
+        return spans
+
+    def _merge_thread(self, records: List[dict]) -> List[ContextSpan]:
+        """
+        Build one span per post of a thread, in posting order.
+
+        Paragraphs that repeat (or quote) text already kept from an earlier
+        post in the same thread are dropped.
+        """
+        seen = set()
+        spans = []
+
+        for record in records:
+            paragraphs = []
+            for para in record.get("text", "").split("\n\n"):
+                key = _normalize(_strip_quote(para))
+                if key and key not in seen:
+                    seen.add(key)
+                    paragraphs.append(para.strip())
+
+            spans.append(ContextSpan(
+                text="\n\n".join(paragraphs),
+                type="thread",
+                url=record.get("url", ""),
+                post_id=record.get("post_id", ""),
+                thread_id=record.get("thread_id", ""),
+                author=record.get("author", ""),
+                score=float(record.get("_score", 0.0)),
+                chunk_ids=[record.get("_id", "")],
+                position=self._position_key(record),
+            ))
+
+        return spans
+
+    def _pack(self, spans: List[ContextSpan], token_budget: int) -> tuple:
+        """Greedily pack spans, highest score first, into the token budget."""
+        kept = []
+        dropped = []
+        used = 0
+        separator_tokens = self.token_counter.count("\n\n")
+
+        for span in spans:
+            span.token_count = self.token_counter.count(span.text)
+            # Spans are renumbered after sorting; price the header with the
+            # widest number it could get, plus the separator before it
+            header_tokens = self.token_counter.count(
+                self.render_span(span, len(spans))
+            ) - span.token_count
+            if kept:
+                header_tokens += separator_tokens
+            remaining = token_budget - used - header_tokens
+
+            if span.token_count <= remaining:
+                kept.append(span)
+                used += header_tokens + span.token_count
+            elif remaining >= self.min_span_tokens:
+                span.text = self.token_counter.truncate_to_tokens(span.text, remaining)
+                span.token_count = self.token_counter.count(span.text)
+                kept.append(span)
+                used += header_tokens + span.token_count
+            else:
+                dropped.extend(span.chunk_ids)
+
+        return kept, dropped, used
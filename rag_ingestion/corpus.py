@@ -0,0 +1,89 @@
+"""
+Load the Kindred dataset as the records the ingesters upsert.
+
+Used by local tooling (local index, bulk export, query router, chunking
+autotuner, benchmarks) that needs the same records as Pinecone without
+connecting to it.
+
+Articles are always chunked flat here: that tooling has no parent-section
+docstore to resolve hierarchical child chunks against, so ChunkingConfig.mode
+is ignored. Hierarchical mode applies to ingest_articles.py only.
+"""
+
+import json
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from config import ChunkingConfig, PathConfig, get_path_config
+from chunking import ArticleChunker, ThreadChunker, extract_article_metadata
+from file_loader import list_files, read_files
+
+logger = logging.getLogger(__name__)
+
+
+def load_article_records(
+    articles_dir: str, chunking_config: Optional[ChunkingConfig] = None
+) -> List[dict]:
+    """Chunk every markdown article into flat upsert records (mode is ignored)."""
+    return list(iter_article_records(articles_dir, chunking_config))
+
+
+def iter_article_records(
+    articles_dir: str, chunking_config: Optional[ChunkingConfig] = None
+) -> Iterator[dict]:
+    """Stream flat article records one file at a time, in filename order."""
+    chunker = ArticleChunker(chunking_config)
+    if chunker.config.mode != "flat":
+        logger.warning(
+            f"CHUNKING_MODE '{chunker.config.mode}' applies to ingest_articles.py only; "
+            "local tooling uses flat chunks"
+        )
+    # Ordered, so record (and local index row) order is stable across runs
+    for filename, content in read_files(articles_dir, list_files(articles_dir, ".md"), ordered=True):
+        metadata = extract_article_metadata(content, filename)
+        chunks = chunker.chunk_article(
+            content=content,
+            title=metadata["title"],
+            url=metadata["url"],
+            filename=filename,
+        )
+        for chunk in chunks:
+            yield chunk.to_record()
+
+
+def load_thread_records(threads_dir: str) -> List[dict]:
+    """Chunk every thread JSON file into upsert records."""
+    return list(iter_thread_records(threads_dir))
+
+
+def iter_thread_records(threads_dir: str) -> Iterator[dict]:
+    """Stream thread records one file at a time, in filename order."""
+    chunker = ThreadChunker()
+    threads = read_files(threads_dir, list_files(threads_dir, ".json"), as_json=True, ordered=True)
+    for _, data in threads:
+        for chunk in chunker.chunk_thread(data):
+            yield chunk.to_record()
+
+
+def load_corpus_records(
+    path_config: Optional[PathConfig] = None,
+    chunking_config: Optional[ChunkingConfig] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Load the whole dataset as upsert records.
+
+    Returns:
+        Dict of {"articles": [...], "threads": [...]} keyed like the namespaces
+    """
+    path_config = path_config or get_path_config()
+    return {
+        "articles": load_article_records(path_config.articles_dir, chunking_config),
+        "threads": load_thread_records(path_config.threads_dir),
+    }
+
+
+def load_evaluation_questions(path_config: Optional[PathConfig] = None) -> List[dict]:
+    """Load the evaluation questions (id, question, expected_sources, ...)."""
+    path_config = path_config or get_path_config()
+    with open(path_config.evaluation_questions, "r", encoding="utf-8") as f:
+        return json.load(f)["questions"]
@@ -0,0 +1,68 @@
+"""
+Local compressed key-value docstore for parent sections.
+
+In hierarchical chunking mode only small child chunks are embedded; the full
+section text lives here once, keyed by parent section ID, and is looked up
+after retrieval instead of being duplicated in index metadata.
+
+Backed by SQLite with zlib-compressed JSON values, so lookups are a single
+indexed query and the store is a single file.
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from dataclasses import asdict
+from typing import Dict, Iterable, List
+
+from chunking import ParentSection
+
+
+class SectionDocstore:
+    """SQLite-backed store of ParentSection objects keyed by parent_id."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections (parent_id TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    def put_many(self, sections: Iterable[ParentSection]) -> int:
+        """Insert or replace sections. Returns the number written."""
+        rows = [
+            (section.parent_id, zlib.compress(json.dumps(asdict(section)).encode("utf-8")))
+            for section in sections
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sections (parent_id, value) VALUES (?, ?)", rows
+            )
+        return len(rows)
+
+    def get_many(self, parent_ids: List[str]) -> Dict[str, ParentSection]:
+        """Fetch sections by ID; missing IDs are left out of the result."""
+        sections = {}
+        parent_ids = list(parent_ids)
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(parent_ids), 500):
+            batch = parent_ids[i : i + 500]
+            placeholders = ",".join("?" for _ in batch)
+            cursor = self.conn.execute(
+                f"SELECT parent_id, value FROM sections WHERE parent_id IN ({placeholders})",
+                batch,
+            )
+            for parent_id, value in cursor:
+                sections[parent_id] = ParentSection(**json.loads(zlib.decompress(value)))
+        return sections
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
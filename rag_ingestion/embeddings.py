@@ -0,0 +1,84 @@
+"""
+Embedding helper for local indexes.
+
+Uses Pinecone's hosted inference with the same model as the integrated index,
+so locally stored vectors match what Pinecone embeds on upsert.
+
+EmbeddingCache keys each vector on a hash of the chunk text, so edited
+articles and chunker changes (which keep chunk IDs) are re-embedded.
+"""
+
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+from pinecone import Pinecone
+
+from config import PineconeConfig, LocalIndexConfig, get_local_index_config
+
+logger = logging.getLogger(__name__)
+
+
+class PineconeEmbedder:
+    """Embeds passages and queries with Pinecone inference."""
+
+    def __init__(
+        self,
+        pinecone_config: PineconeConfig,
+        local_config: Optional[LocalIndexConfig] = None,
+    ):
+        self.config = pinecone_config
+        self.local_config = local_config or get_local_index_config()
+        self.pc = Pinecone(api_key=pinecone_config.api_key)
+
+    def embed_passages(self, texts: List[str]) -> List[List[float]]:
+        """Embed document texts (chunks) for storage."""
+        return self._embed(texts, input_type="passage")
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed search queries."""
+        return self._embed(texts, input_type="query")
+
+    def _embed(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """Embed texts in batches the inference API accepts."""
+        batch_size = self.local_config.embed_batch_size
+        vectors = []
+        for i in range(0, len(texts), batch_size):
+            result = self.pc.inference.embed(
+                model=self.config.embedding_model,
+                inputs=texts[i : i + batch_size],
+                parameters={"input_type": input_type, "truncate": "END"},
+            )
+            vectors.extend(item["values"] for item in result)
+        return vectors
+
+
+class EmbeddingCache:
+    """Passage embeddings keyed by a hash of the chunk text, saved as .npz."""
+
+    def __init__(self, embedder: PineconeEmbedder, path: str):
+        self.embedder = embedder
+        self.path = path
+        self.vectors: Dict[str, np.ndarray] = {}
+        if os.path.exists(path):
+            cached = np.load(path)
+            if "keys" in cached.files:  # Older caches were keyed by chunk ID; re-embed those
+                self.vectors = dict(zip(cached["keys"].tolist(), cached["vectors"]))
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        keys = [hashlib.md5(text.encode("utf-8")).hexdigest() for text in texts]
+        missing = {key: text for key, text in zip(keys, texts) if key not in self.vectors}
+        if missing:
+            logger.info(f"  Embedding {len(missing)} new chunks...")
+            vectors = self.embedder.embed_passages(list(missing.values()))
+            for key, vector in zip(missing, vectors):
+                self.vectors[key] = np.asarray(vector, dtype=np.float32)
+            self.save()
+        return np.stack([self.vectors[key] for key in keys])
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        keys = list(self.vectors)
+        np.savez(self.path, keys=np.array(keys), vectors=np.stack([self.vectors[k] for k in keys]))
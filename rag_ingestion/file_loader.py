@@ -0,0 +1,125 @@
+"""
+Concurrent loading of dataset files.
+
+On network-mounted directories with many small files, per-file open/read
+latency dominates a sequential loop. Files are listed with os.scandir and
+read on a thread pool with a bounded number of reads in flight, so memory
+stays flat however large the directory is.
+
+JSON is parsed with orjson when it is installed, and with the standard
+library json module otherwise. Either way, a JSON file that isn't valid
+UTF-8 is skipped with a warning like any other invalid JSON file.
+"""
+
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Iterator, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+
+
+def list_files(directory: str, suffix: str) -> List[str]:
+    """Sorted names of the regular files in `directory` ending in `suffix`."""
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            # Same selection as glob("*<suffix>"): no hidden files, no directories
+            if entry.name.endswith(suffix)
+            and not entry.name.startswith(".")
+            and entry.is_file()
+        )
+
+
+def parse_json(data: bytes) -> Any:
+    """
+    Parse JSON bytes.
+
+    Raises:
+        json.JSONDecodeError: Invalid JSON (orjson also raises this for invalid UTF-8)
+        UnicodeDecodeError: Invalid UTF-8, without orjson
+    """
+    if orjson is not None:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data.decode("utf-8"))
+
+
+def _read(directory: str, filename: str, as_json: bool) -> Tuple[str, Any, Optional[Exception]]:
+    with open(os.path.join(directory, filename), "rb") as f:
+        data = f.read()
+    if not as_json:
+        # Match text-mode open(): universal newlines, so CRLF files split on "\n\n"
+        text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        return filename, text, None
+    try:
+        return filename, parse_json(data), None
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return filename, None, e
+
+
+def read_files(
+    directory: str,
+    filenames: List[str],
+    as_json: bool = False,
+    ordered: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Read files concurrently, yielding (filename, content) as reads complete.
+
+    Args:
+        directory: Directory containing the files
+        filenames: Names of the files to read (see list_files)
+        as_json: Parse each file as JSON; invalid files are skipped with a warning
+        ordered: Yield in the order of `filenames` instead of completion order
+        max_workers: Reader threads
+        max_in_flight: Maximum reads submitted but not yet yielded
+            (defaults to 4 x max_workers)
+
+    Yields:
+        (filename, content) with content as text, or the parsed JSON
+    """
+    max_in_flight = max_in_flight or 4 * max_workers
+    pending = iter(filenames)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: Deque[Future] = deque()
+
+        def submit(count: int) -> None:
+            for filename in pending:
+                in_flight.append(executor.submit(_read, directory, filename, as_json))
+                count -= 1
+                if count <= 0:
+                    break
+
+        submit(max_in_flight)
+        while in_flight:
+            if ordered:
+                done: List[Future] = [in_flight.popleft()]
+            else:
+                finished: Set[Future] = wait(in_flight, return_when=FIRST_COMPLETED).done
+                done = [future for future in in_flight if future in finished]
+                for future in done:
+                    in_flight.remove(future)
+
+            for future in done:
+                filename, content, error = future.result()
+                if error is not None:
+                    logger.warning(f"Skipping invalid JSON file {filename}: {error}")
+                else:
+                    logger.debug(f"Loaded: {filename}")
+                    yield filename, content
+            submit(len(done))
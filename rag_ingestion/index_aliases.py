@@ -0,0 +1,110 @@
+"""
+Local registry mapping index aliases to versioned Pinecone indexes.
+
+Readers look up an alias (e.g. "kindred-rag") to find the physical index
+currently serving it (e.g. "kindred-rag-v20250101120000"). Rebuilds write a
+new version next to the live one and switch the alias only after it
+validates, so readers never see a half-rebuilt index.
+
+The registry is a small JSON file, replaced atomically on every switch.
+Switches take an exclusive lock on `<registry>.lock`, so two rebuilds can't
+overwrite each other's entries. It lives outside the working tree (see
+config.DEFAULT_ALIAS_REGISTRY); deployments with several hosts point
+PINECONE_ALIAS_REGISTRY at shared storage:
+
+    {
+      "kindred-rag": {
+        "index": "kindred-rag-v20250101120000",
+        "previous": "kindred-rag-v20241201090000",
+        "switched_at": "2025-01-01T12:05:00+00:00"
+      }
+    }
+"""
+
+import fcntl
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+
+def version_name(alias: str) -> str:
+    """A new physical index name for an alias, e.g. kindred-rag-v20250101120000."""
+    return f"{alias}-v{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+
+
+def is_version_of(alias: str, index_name: str) -> bool:
+    """Whether index_name was named by version_name for this alias."""
+    return re.fullmatch(rf"{re.escape(alias)}-v\d{{14}}", index_name) is not None
+
+
+class AliasRegistry:
+    """Alias -> physical index name, stored in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def aliases(self) -> Dict[str, dict]:
+        """All registry entries; empty if the registry doesn't exist yet."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def resolve(self, alias: str) -> Optional[str]:
+        """Physical index name for an alias, or None if it isn't registered."""
+        entry = self.aliases().get(alias)
+        return entry["index"] if entry else None
+
+    def switch(self, alias: str, index_name: str) -> Optional[str]:
+        """
+        Point an alias at a new index.
+
+        The registry file is replaced in one rename, so a concurrent reader
+        sees either the old mapping or the new one, never a partial file.
+        The read-modify-write runs under the registry's file lock.
+
+        Returns:
+            The index the alias pointed at before, if any
+        """
+        with self._locked():
+            return self._switch(alias, index_name)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _switch(self, alias: str, index_name: str) -> Optional[str]:
+        aliases = self.aliases()
+        previous = aliases.get(alias, {}).get("index")
+        aliases[alias] = {
+            "index": index_name,
+            "previous": previous,
+            "switched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".aliases-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(aliases, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return previous
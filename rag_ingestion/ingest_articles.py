@@ -13,15 +13,17 @@ Environment variables required:
 
 import os
 import sys
-import glob
 import logging
 import time
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from pinecone import Pinecone
 
 from config import get_pinecone_config, get_path_config, PineconeConfig
-from chunking import ArticleChunker, ArticleChunk, extract_article_metadata
+from chunking import ArticleChunker, ArticleChunk, ParentSection, extract_article_metadata
+from docstore import SectionDocstore
+from file_loader import list_files, read_files
+from pinecone_index import get_or_create_index, resolve_index_name, upsert_batch
 
 # Configure logging
 logging.basicConfig(
@@ -35,88 +37,78 @@ logger = logging.getLogger(__name__)
 class ArticleIngester:
     """Handles ingestion of markdown articles into Pinecone with integrated embedding."""
 
-    def __init__(self, pinecone_config: PineconeConfig):
+    def __init__(
+        self, pinecone_config: PineconeConfig, docstore_path: Optional[str] = None
+    ):
         self.config = pinecone_config
 
         # Initialize Pinecone client
-        self.pc = Pinecone(api_key=pinecone_config.api_key)
+        self.pc = Pinecone(
+            api_key=pinecone_config.api_key, host=pinecone_config.controller_host
+        )
+
+        # Resolve the alias once so the index and its docstore are the same version
+        self.index_name = resolve_index_name(self.pc, pinecone_config)
+        self.docstore_path = docstore_path or get_path_config().docstore_path(self.index_name)
 
         # Initialize chunker
         self.chunker = ArticleChunker()
+        self.parent_sections: List[ParentSection] = []
+
+        # Client-side time per upsert batch, retries and backoff included
+        self.upsert_latencies_ms: List[float] = []
 
         # Get or create index with integrated embedding
         self.index = self._get_or_create_index()
 
     def _get_or_create_index(self):
         """Get existing index or create with integrated embedding model."""
-        existing_indexes = [idx.name for idx in self.pc.list_indexes()]
-
-        if self.config.index_name not in existing_indexes:
-            logger.info(
-                f"Creating index '{self.config.index_name}' with integrated embedding..."
-            )
-            logger.info(f"  Embedding model: {self.config.embedding_model}")
-
-            # Create index with integrated embedding
-            self.pc.create_index_for_model(
-                name=self.config.index_name,
-                cloud=self.config.cloud,
-                region=self.config.region,
-                embed={
-                    "model": self.config.embedding_model,
-                    "field_map": {"text": "text"},  # Map 'text' field to be embedded
-                },
-            )
-
-            # Wait for index to be ready
-            logger.info("Waiting for index to be ready...")
-            while True:
-                desc = self.pc.describe_index(self.config.index_name)
-                if desc.status.ready:
-                    break
-                time.sleep(2)
-
-            logger.info(f"Index '{self.config.index_name}' created and ready!")
-        else:
-            logger.info(f"Using existing index '{self.config.index_name}'")
-
-        return self.pc.Index(self.config.index_name)
+        return get_or_create_index(self.pc, self.config, self.index_name)
 
     def load_articles(self, articles_dir: str) -> List[Tuple[str, str]]:
         """Load all markdown files from the articles directory."""
-        pattern = os.path.join(articles_dir, "*.md")
-        files = glob.glob(pattern)
+        filenames = list_files(articles_dir, ".md")
 
-        if not files:
+        if not filenames:
             raise FileNotFoundError(
                 f"No markdown files found in {articles_dir}. "
                 "Ensure the kindred-dataset/articles/ directory exists and contains .md files."
             )
 
-        articles = []
-        for filepath in sorted(files):
-            filename = os.path.basename(filepath)
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-            articles.append((filename, content))
-            logger.debug(f"Loaded: {filename}")
+        articles = list(read_files(articles_dir, filenames, ordered=True))
 
         logger.info(f"Loaded {len(articles)} article files")
         return articles
 
     def chunk_articles(self, articles: List[Tuple[str, str]]) -> List[ArticleChunk]:
-        """Chunk all articles into embeddings-ready pieces."""
+        """
+        Chunk all articles into embeddings-ready pieces.
+
+        In hierarchical mode the returned chunks are small child chunks and
+        the full sections are collected in self.parent_sections.
+        """
         all_chunks = []
+        self.parent_sections = []
+        hierarchical = self.chunker.config.mode == "hierarchical"
 
         for filename, content in articles:
             metadata = extract_article_metadata(content, filename)
 
-            chunks = self.chunker.chunk_article(
-                content=content,
-                title=metadata["title"],
-                url=metadata["url"],
-                filename=filename,
-            )
+            if hierarchical:
+                chunks, parents = self.chunker.chunk_article_hierarchical(
+                    content=content,
+                    title=metadata["title"],
+                    url=metadata["url"],
+                    filename=filename,
+                )
+                self.parent_sections.extend(parents)
+            else:
+                chunks = self.chunker.chunk_article(
+                    content=content,
+                    title=metadata["title"],
+                    url=metadata["url"],
+                    filename=filename,
+                )
 
             all_chunks.extend(chunks)
             logger.debug(f"Chunked {filename} into {len(chunks)} chunks")
@@ -136,20 +128,7 @@ class ArticleIngester:
         With upsert_records, metadata fields go at the top level of each record.
         """
         # Build records with text for embedding
-        # Note: For upsert_records, all fields except _id and text are treated as metadata
-        records = []
-        for chunk in chunks:
-            record = {
-                "_id": chunk.chunk_id,
-                "text": chunk.text,  # Pinecone embeds this automatically
-                # Metadata fields at top level
-                "type": "article",
-                "title": chunk.title,
-                "url": chunk.url,
-                "filename": chunk.filename,
-                "section": chunk.section,
-            }
-            records.append(record)
+        records = [chunk.to_record() for chunk in chunks]
 
         # Upsert in batches
         total_upserted = 0
@@ -163,9 +142,9 @@ class ArticleIngester:
                 f"Upserting batch {batch_num}/{total_batches} ({len(batch)} records)..."
             )
 
-            self.index.upsert_records(
-                namespace=self.config.articles_namespace, records=batch
-            )
+            started = time.monotonic()
+            upsert_batch(self.index, self.config.articles_namespace, batch)
+            self.upsert_latencies_ms.append((time.monotonic() - started) * 1000.0)
             total_upserted += len(batch)
 
         logger.info(
@@ -186,6 +165,13 @@ class ArticleIngester:
         # Chunk articles
         chunks = self.chunk_articles(articles)
 
+        # Hierarchical mode: store full sections locally, embed only the children
+        if self.parent_sections:
+            docstore = SectionDocstore(self.docstore_path)
+            stored = docstore.put_many(self.parent_sections)
+            docstore.close()
+            logger.info(f"Stored {stored} parent sections in {self.docstore_path}")
+
         # Upsert to Pinecone (embeddings generated automatically)
         upserted_count = self.upsert_to_pinecone(chunks)
 
@@ -13,8 +13,6 @@ Environment variables required:
 
 import os
 import sys
-import glob
-import json
 import logging
 import time
 from typing import List, Tuple
@@ -23,6 +21,8 @@ from pinecone import Pinecone
 
 from config import get_pinecone_config, get_path_config, PineconeConfig
 from chunking import ThreadChunker, ThreadPostChunk
+from file_loader import list_files, read_files
+from pinecone_index import get_or_create_index, resolve_index_name, upsert_batch
 
 # Configure logging
 logging.basicConfig(
@@ -40,68 +40,36 @@ class ThreadIngester:
         self.config = pinecone_config
         
         # Initialize Pinecone client
-        self.pc = Pinecone(api_key=pinecone_config.api_key)
+        self.pc = Pinecone(
+            api_key=pinecone_config.api_key, host=pinecone_config.controller_host
+        )
         
         # Initialize chunker
         self.chunker = ThreadChunker()
         
+        # Client-side time per upsert batch, retries and backoff included
+        self.upsert_latencies_ms: List[float] = []
+        
         # Get or create index with integrated embedding
         self.index = self._get_or_create_index()
     
     def _get_or_create_index(self):
         """Get existing index or create with integrated embedding model."""
-        existing_indexes = [idx.name for idx in self.pc.list_indexes()]
-        
-        if self.config.index_name not in existing_indexes:
-            logger.info(f"Creating index '{self.config.index_name}' with integrated embedding...")
-            logger.info(f"  Embedding model: {self.config.embedding_model}")
-            
-            # Create index with integrated embedding
-            self.pc.create_index_for_model(
-                name=self.config.index_name,
-                cloud=self.config.cloud,
-                region=self.config.region,
-                embed={
-                    "model": self.config.embedding_model,
-                    "field_map": {"text": "text"}
-                }
-            )
-            
-            # Wait for index to be ready
-            logger.info("Waiting for index to be ready...")
-            while True:
-                desc = self.pc.describe_index(self.config.index_name)
-                if desc.status.ready:
-                    break
-                time.sleep(2)
-            
-            logger.info(f"Index '{self.config.index_name}' created and ready!")
-        else:
-            logger.info(f"Using existing index '{self.config.index_name}'")
-        
-        return self.pc.Index(self.config.index_name)
+        # Resolve the alias once so every call below targets the same index
+        return get_or_create_index(self.pc, self.config, resolve_index_name(self.pc, self.config))
     
     def load_threads(self, threads_dir: str) -> List[Tuple[str, dict]]:
         """Load all JSON thread files from the threads directory."""
-        pattern = os.path.join(threads_dir, "*.json")
-        files = glob.glob(pattern)
+        filenames = list_files(threads_dir, ".json")
         
-        if not files:
+        if not filenames:
             raise FileNotFoundError(
                 f"No JSON files found in {threads_dir}. "
                 "Ensure the kindred-dataset/community-threads/ directory exists and contains .json files."
             )
         
-        threads = []
-        for filepath in sorted(files):
-            filename = os.path.basename(filepath)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                try:
-                    data = json.load(f)
-                    threads.append((filename, data))
-                    logger.debug(f"Loaded: {filename}")
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Skipping invalid JSON file {filename}: {e}")
+        # Invalid JSON files are skipped with a warning
+        threads = list(read_files(threads_dir, filenames, as_json=True, ordered=True))
         
         logger.info(f"Loaded {len(threads)} thread files")
         return threads
@@ -126,21 +94,7 @@ class ThreadIngester:
         With upsert_records, metadata fields go at the top level of each record.
         """
         # Build records with text for embedding
-        # Note: For upsert_records, all fields except _id and text are treated as metadata
-        records = []
-        for chunk in chunks:
-            record = {
-                "_id": chunk.chunk_id,
-                "text": chunk.text,  # Pinecone embeds this automatically
-                # Metadata fields at top level
-                "type": "thread",
-                "thread_id": chunk.thread_id,
-                "url": chunk.url,
-                "author": chunk.author,
-                "timestamp": chunk.timestamp,
-                "post_id": chunk.post_id,
-            }
-            records.append(record)
+        records = [chunk.to_record() for chunk in chunks]
         
         # Upsert in batches
         total_upserted = 0
@@ -152,10 +106,9 @@ class ThreadIngester:
             
             logger.info(f"Upserting batch {batch_num}/{total_batches} ({len(batch)} records)...")
             
-            self.index.upsert_records(
-                namespace=self.config.threads_namespace,
-                records=batch
-            )
+            started = time.monotonic()
+            upsert_batch(self.index, self.config.threads_namespace, batch)
+            self.upsert_latencies_ms.append((time.monotonic() - started) * 1000.0)
             total_upserted += len(batch)
         
         logger.info(f"Upserted {total_upserted} records to namespace '{self.config.threads_namespace}'")
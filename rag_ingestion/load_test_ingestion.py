@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load-test both ingesters against the local Pinecone stand-in.
+
+Starts a stand-in server in-process, creates the index through the
+describe_index readiness loop, runs ArticleIngester and ThreadIngester
+concurrently, then reports sustained throughput and the upsert latency the
+ingesters saw (one sample per batch, retries and backoff included, so
+throttling shows up in the tail). Request and status counts come from the
+stand-in's recordings.
+
+Usage:
+    python load_test_ingestion.py
+    python load_test_ingestion.py --workers 4 --rounds 3 --rate-429 0.1 --tokens-per-minute 200000
+
+No Pinecone API key is needed; nothing leaves the machine.
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List
+
+from config import PineconeConfig, get_path_config
+from ingest_articles import ArticleIngester
+from ingest_threads import ThreadIngester
+from pinecone_stand_in import StandInConfig, start_in_background
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(
+    recordings: List[dict], latencies: List[float], wall_seconds: float
+) -> Dict[str, float]:
+    """Throughput from the recorded upsert requests, latency from the client's batch timings."""
+    upserts = [r for r in recordings if r["path"].endswith("/upsert")]
+    accepted = [r for r in upserts if r["status"] < 300]
+    records = sum(r["records"] for r in accepted)
+    return {
+        "wall_seconds": wall_seconds,
+        "upsert_requests": len(upserts),
+        "accepted": len(accepted),
+        "throttled_429": sum(1 for r in upserts if r["status"] == 429),
+        "errors_5xx": sum(1 for r in upserts if r["status"] >= 500),
+        "records": records,
+        "records_per_second": records / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else 0.0,
+        "describe_index_calls": sum(
+            1 for r in recordings if r["method"] == "GET" and r["path"].startswith("/indexes/")
+        ),
+    }
+
+
+def run_load_test(
+    stand_in_config: StandInConfig, workers: int = 1, rounds: int = 1
+) -> Dict[str, float]:
+    """
+    Run `workers` concurrent article+thread ingester pairs, `rounds` times each.
+
+    Returns the summary from `summarize`.
+    """
+    path_config = get_path_config()
+    server = start_in_background(stand_in_config)
+    logger.info(f"Stand-in listening on {server.base_url}")
+    pinecone_config = PineconeConfig(api_key="stand-in", controller_host=server.base_url)
+
+    # Create the index (and wait through the readiness loop) once up front,
+    # so concurrent workers don't race each other to create it
+    ArticleIngester(pinecone_config)
+
+    failures: List[BaseException] = []
+    latencies: List[float] = []
+
+    def worker():
+        try:
+            for _ in range(rounds):
+                articles = ArticleIngester(pinecone_config)
+                articles.run(path_config.articles_dir)
+                threads = ThreadIngester(pinecone_config)
+                threads.run(path_config.threads_dir)
+                latencies.extend(articles.upsert_latencies_ms + threads.upsert_latencies_ms)
+        except BaseException as e:  # Surface worker failures in the report
+            failures.append(e)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.monotonic() - started
+
+    with server.state.lock:
+        recordings = list(server.state.recordings)
+    server.shutdown()
+    server.server_close()
+
+    summary = summarize(recordings, latencies, wall_seconds)
+    summary["worker_failures"] = len(failures)
+    for failure in failures:
+        logger.error(f"Worker failed: {failure}")
+    return summary
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load-test ingestion against the Pinecone stand-in")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent ingester pairs")
+    parser.add_argument("--rounds", type=int, default=1, help="Ingestion runs per worker")
+    parser.add_argument("--latency-ms", type=float, default=StandInConfig.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=StandInConfig.latency_sigma)
+    parser.add_argument("--rate-429", type=float, default=StandInConfig.rate_429)
+    parser.add_argument("--rate-5xx", type=float, default=StandInConfig.rate_5xx)
+    parser.add_argument("--tokens-per-minute", type=int, default=StandInConfig.tokens_per_minute)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = run_load_test(
+        StandInConfig(
+            latency_ms=args.latency_ms,
+            latency_sigma=args.latency_sigma,
+            rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx,
+            tokens_per_minute=args.tokens_per_minute,
+            seed=args.seed,
+        ),
+        workers=args.workers,
+        rounds=args.rounds,
+    )
+
+    logger.info("=" * 60)
+    logger.info("Ingestion load test complete!")
+    logger.info(f"  Wall time: {summary['wall_seconds']:.1f}s")
+    logger.info(f"  Records upserted: {summary['records']} ({summary['records_per_second']:.1f}/s)")
+    logger.info(
+        f"  Upsert requests: {summary['upsert_requests']} "
+        f"(accepted {summary['accepted']}, 429 {summary['throttled_429']}, 5xx {summary['errors_5xx']})"
+    )
+    logger.info(
+        f"  Upsert batch latency ms (client): p50 {summary['p50_ms']:.1f}, p95 {summary['p95_ms']:.1f}, "
+        f"p99 {summary['p99_ms']:.1f}, max {summary['max_ms']:.1f}"
+    )
+    logger.info(f"  describe_index calls: {summary['describe_index_calls']}")
+    logger.info("=" * 60)
+
+    if summary["worker_failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
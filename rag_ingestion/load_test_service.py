@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Load-test the async retrieval service.
+
+Runs a closed loop of `--concurrency` clients against /search or /context
+for `--duration` seconds, then reports throughput, latency percentiles and
+the service's coalescing and cache counters from /health.
+
+Two query mixes are run and reported side by side:
+
+    repeated  clients cycle through the evaluation questions, so most
+              requests are coalesced or served from the response cache
+    unique    every request gets a distinct suffix, so each one reaches
+              the backend
+
+--no-cache starts the in-process service with the response cache disabled.
+
+Without --url, everything runs locally: a Pinecone stand-in is started in
+a subprocess (so its simulated latency doesn't compete with the service
+for the GIL), the corpus is ingested into it, and a retrieval service is
+started in-process in front of it. With --url, an already running service
+is tested instead.
+
+A /search response streams one NDJSON line per namespace; a line carrying
+an "error" key counts the request as an error even though the status is
+200. Backend calls are the service's own count of searches it sent to the
+index (/health "backend_calls"), not an estimate from the request counters.
+
+Usage:
+    python load_test_service.py
+    python load_test_service.py --concurrency 200 --duration 30 --endpoint context
+    python load_test_service.py --no-cache --queries unique
+    python load_test_service.py --url http://127.0.0.1:8080
+
+No Pinecone API key is needed without --url; nothing leaves the machine.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from config import PineconeConfig, ServiceConfig, get_path_config
+from corpus import load_evaluation_questions
+from ingest_articles import ArticleIngester
+from ingest_threads import ThreadIngester
+from load_test_ingestion import percentile
+from pinecone_stand_in import StandInConfig
+from retrieval_service import create_service
+
+logger = logging.getLogger(__name__)
+
+QUERY_MIXES = ("repeated", "unique")
+HEALTH_COUNTERS = ("coalesced", "cache_hits", "backend_calls")
+
+
+def stream_has_error(body: bytes) -> bool:
+    """Whether any NDJSON line of a /search stream reports a namespace error."""
+    for line in body.splitlines():
+        if line.strip() and "error" in json.loads(line):
+            return True
+    return False
+
+
+async def drive(
+    url: str, questions: List[str], endpoint: str, concurrency: int, duration: float,
+    unique: bool = False,
+) -> Dict[str, float]:
+    """Run the closed-loop clients and summarize their requests."""
+    latencies: List[float] = []
+    errors = 0
+    sent = 0
+    deadline = time.monotonic() + duration
+
+    async def client(session: aiohttp.ClientSession, offset: int):
+        nonlocal errors, sent
+        i = offset
+        while time.monotonic() < deadline:
+            query = questions[i % len(questions)]
+            if unique:
+                # A per-request suffix defeats coalescing and the response cache
+                query = f"{query} (request {sent})"
+            body = {"query": query}
+            i += 1
+            sent += 1
+            started = time.monotonic()
+            try:
+                async with session.post(f"{url}/{endpoint}", json=body) as resp:
+                    payload = await resp.read()  # Include the full stream in the latency
+                    if resp.status >= 400 or (endpoint == "search" and stream_has_error(payload)):
+                        errors += 1
+                        continue
+            except (aiohttp.ClientError, ValueError):
+                errors += 1
+                continue
+            latencies.append((time.monotonic() - started) * 1000.0)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.get(f"{url}/health") as resp:
+            before = await resp.json()
+        started = time.monotonic()
+        await asyncio.gather(*[
+            client(session, random.randrange(len(questions))) for _ in range(concurrency)
+        ])
+        wall_seconds = time.monotonic() - started
+        async with session.get(f"{url}/health") as resp:
+            after = await resp.json()
+    # Counters are cumulative over the service's lifetime
+    health = {key: after.get(key, 0) - before.get(key, 0) for key in HEALTH_COUNTERS}
+
+    return {
+        "wall_seconds": wall_seconds,
+        "requests": len(latencies),
+        "errors": errors,
+        "qps": len(latencies) / wall_seconds if wall_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else 0.0,
+        "backend_calls": health["backend_calls"],
+        "coalesced": health["coalesced"],
+        "cache_hits": health["cache_hits"],
+    }
+
+
+def start_stand_in(config: StandInConfig, timeout_s: float = 30.0):
+    """
+    Start the Pinecone stand-in as a subprocess on a free local port.
+
+    Returns:
+        (process, base_url); terminate the process when done
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    args = [
+        sys.executable, str(Path(__file__).with_name("pinecone_stand_in.py")),
+        "--port", str(port),
+        "--latency-ms", str(config.latency_ms),
+        "--latency-sigma", str(config.latency_sigma),
+        "--ready-after", str(config.ready_after_s),
+    ]
+    if config.seed is not None:
+        args += ["--seed", str(config.seed)]
+    process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stand-in exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(f"{base_url}/indexes", timeout=1.0).close()
+            return process, base_url
+        except urllib.error.HTTPError:
+            return process, base_url  # Listening, whatever it answered
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Stand-in didn't start listening within {timeout_s:.0f}s")
+
+
+async def run_in_process(
+    stand_in_config: StandInConfig, questions: List[str], endpoint: str,
+    concurrency: int, duration: float, mixes: List[str], cache: bool = True,
+) -> Dict[str, Dict[str, float]]:
+    """Stand-in subprocess + ingested corpus + a fresh service per query mix, all local."""
+    path_config = get_path_config()
+    stand_in, base_url = start_stand_in(stand_in_config)
+    summaries = {}
+    try:
+        logger.info(f"Stand-in listening on {base_url}; ingesting corpus")
+        pinecone_config = PineconeConfig(api_key="stand-in", controller_host=base_url)
+        ArticleIngester(pinecone_config).run(path_config.articles_dir)
+        ThreadIngester(pinecone_config).run(path_config.threads_dir)
+
+        service_config = ServiceConfig(port=0, max_connections=concurrency)
+        if not cache:
+            service_config.cache_ttl_s = 0.0
+        for mix in mixes:
+            # A fresh service per mix, so no mix starts with another's cache
+            service = create_service(pinecone_config, service_config)
+            runner = web.AppRunner(service.build_app(), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, service_config.host, service_config.port)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                summaries[mix] = await drive(
+                    f"http://{service_config.host}:{port}", questions, endpoint,
+                    concurrency, duration, unique=mix == "unique",
+                )
+            finally:
+                await runner.cleanup()
+    finally:
+        stand_in.terminate()
+        stand_in.wait()
+    return summaries
+
+
+async def run_remote(
+    url: str, questions: List[str], endpoint: str, concurrency: int, duration: float,
+    mixes: List[str],
+) -> Dict[str, Dict[str, float]]:
+    """Drive an already running service with each query mix in turn."""
+    return {
+        mix: await drive(url, questions, endpoint, concurrency, duration, unique=mix == "unique")
+        for mix in mixes
+    }
+
+
+def report(mix: str, summary: Dict[str, float]) -> None:
+    logger.info(f"  [{mix} queries]")
+    logger.info(
+        f"    Requests: {summary['requests']} in {summary['wall_seconds']:.1f}s "
+        f"({summary['qps']:.1f} QPS), errors {summary['errors']}"
+    )
+    logger.info(
+        f"    Latency ms: p50 {summary['p50_ms']:.1f}, p95 {summary['p95_ms']:.1f}, "
+        f"p99 {summary['p99_ms']:.1f}, max {summary['max_ms']:.1f}"
+    )
+    logger.info(
+        f"    Backend calls: {summary['backend_calls']} "
+        f"(coalesced {summary['coalesced']}, cache hits {summary['cache_hits']})"
+    )
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load-test the async retrieval service")
+    parser.add_argument("--url", default=None, help="Running service to test (default: in-process)")
+    parser.add_argument("--endpoint", choices=("search", "context"), default="search")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run per query mix")
+    parser.add_argument("--queries", choices=QUERY_MIXES + ("both",), default="both",
+                        help="Query mix to run (default: both)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the in-process service's response cache")
+    parser.add_argument("--latency-ms", type=float, default=StandInConfig.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=StandInConfig.latency_sigma)
+    args = parser.parse_args()
+    if args.url and args.no_cache:
+        parser.error("--no-cache applies to the in-process service; start the service with its cache disabled instead")
+
+    questions = [q["question"] for q in load_evaluation_questions()]
+    mixes = list(QUERY_MIXES) if args.queries == "both" else [args.queries]
+
+    if args.url:
+        summaries = asyncio.run(run_remote(
+            args.url.rstrip("/"), questions, args.endpoint, args.concurrency, args.duration, mixes
+        ))
+    else:
+        stand_in_config = StandInConfig(
+            latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, ready_after_s=0.0
+        )
+        summaries = asyncio.run(run_in_process(
+            stand_in_config, questions, args.endpoint, args.concurrency, args.duration,
+            mixes, cache=not args.no_cache,
+        ))
+
+    logger.info("=" * 60)
+    logger.info("Retrieval service load test complete!")
+    logger.info(
+        f"  Endpoint: /{args.endpoint}, concurrency {args.concurrency}, "
+        f"cache {'off' if args.no_cache else 'on'}"
+    )
+    for mix, summary in summaries.items():
+        report(mix, summary)
+    logger.info("=" * 60)
+
+    if any(summary["errors"] for summary in summaries.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Local quantized vector index for Kindred chunk embeddings.
+
+multilingual-e5-large vectors are 1024-dim float32 (4 KB per chunk). This
+index keeps only a compact code per chunk in RAM and leaves the float
+vectors and the records (chunk text and metadata) in memory-mapped files
+on disk:
+
+- "int8":   per-dimension scalar quantization, 1 KB per chunk
+- "binary": 1 bit per dimension (sign), 128 bytes per chunk
+- "none":   float32 vectors are scanned directly (exact baseline)
+
+Search runs over the codes (int8 dot products or Hamming distance) and the
+top `top_k * rescore_multiplier` candidates are rescored exactly against
+the memory-mapped float vectors.
+
+On-disk layout of an index directory:
+    index.json      dimension, quantization, count
+    vectors.f32     normalized float32 vectors (memory-mapped)
+    codes.npy       quantized codes
+    scales.npy      int8 per-dimension scales (int8 only)
+    records.jsonl   one record (id + metadata) per row
+    records.offsets.npy  byte offset of each row in records.jsonl (memory-mapped)
+    metadata_index.*  bitmap metadata index used by filtered search
+"""
+
+import json
+import mmap
+import os
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from metadata_index import MetadataIndex
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+# Rows scored per block, bounds temporary memory during a scan
+_BLOCK_ROWS = 65536
+
+# Number of set bits for every byte value, for Hamming distance
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so dot product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class RecordStore:
+    """
+    Read-only, row-addressable view of records.jsonl.
+
+    Records stay on disk; only the rows asked for (the hits of a search) are
+    parsed. Row offsets come from a memory-mapped offsets array.
+    """
+
+    def __init__(self, path: str):
+        records_path = os.path.join(path, "records.jsonl")
+        self.offsets = np.load(os.path.join(path, "records.offsets.npy"), mmap_mode="r")
+        self._file = open(records_path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> dict:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self._data[start:end])
+
+    def __iter__(self) -> Iterator[dict]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def disk_bytes(self) -> int:
+        return len(self._data) + int(self.offsets.nbytes)
+
+
+class LocalVectorIndex:
+    """
+    A single-namespace vector index stored in a local directory.
+
+    Build with `LocalVectorIndex.create(...)`, reopen with `LocalVectorIndex.open(path)`.
+    Search results use Pinecone's hit shape ({"_id", "_score", "fields"}).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimension: int,
+        quantization: str,
+        records: RecordStore,
+        vectors: np.ndarray,
+        codes: Optional[np.ndarray],
+        scales: Optional[np.ndarray],
+        metadata_index: MetadataIndex,
+    ):
+        self.path = path
+        self.dimension = dimension
+        self.quantization = quantization
+        self.records = records
+        self.vectors = vectors
+        self.codes = codes
+        self.scales = scales
+        self.metadata_index = metadata_index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        records: List[dict],
+        vectors: List[List[float]],
+        quantization: str = "int8",
+    ) -> "LocalVectorIndex":
+        """
+        Write a new index directory and open it.
+
+        Args:
+            path: Directory to write the index to
+            records: Records as built by the ingesters (must include _id)
+            vectors: One embedding per record
+            quantization: "none", "int8" or "binary"
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization '{quantization}'. Expected one of {QUANTIZATIONS}"
+            )
+        if not records:
+            raise ValueError("Cannot create an empty index")
+        if len(records) != len(vectors):
+            raise ValueError(
+                f"Got {len(records)} records but {len(vectors)} vectors"
+            )
+
+        os.makedirs(path, exist_ok=True)
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        dimension = matrix.shape[1]
+
+        float_file = np.memmap(
+            os.path.join(path, "vectors.f32"),
+            dtype=np.float32,
+            mode="w+",
+            shape=matrix.shape,
+        )
+        float_file[:] = matrix
+        float_file.flush()
+        del float_file
+
+        if quantization == "int8":
+            scales = np.abs(matrix).max(axis=0) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.round(matrix / scales), -127, 127).astype(np.int8)
+            np.save(os.path.join(path, "scales.npy"), scales.astype(np.float32))
+            np.save(os.path.join(path, "codes.npy"), codes)
+        elif quantization == "binary":
+            np.save(os.path.join(path, "codes.npy"), np.packbits(matrix > 0, axis=1))
+
+        offsets = [0]
+        with open(os.path.join(path, "records.jsonl"), "wb") as f:
+            for record in records:
+                line = (json.dumps(record) + "\n").encode("utf-8")
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        np.save(os.path.join(path, "records.offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+        MetadataIndex.build(records).save(path)
+
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "dimension": dimension,
+                    "quantization": quantization,
+                    "count": len(records),
+                },
+                f,
+                indent=2,
+            )
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> "LocalVectorIndex":
+        """Open an existing index directory."""
+        info_path = os.path.join(path, "index.json")
+        if not os.path.exists(info_path):
+            raise FileNotFoundError(f"No local index found at {path}")
+
+        with open(info_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        records = RecordStore(path)
+
+        vectors = np.memmap(
+            os.path.join(path, "vectors.f32"),
+            dtype=np.float32,
+            mode="r",
+            shape=(info["count"], info["dimension"]),
+        )
+        codes = None
+        scales = None
+        if info["quantization"] != "none":
+            codes = np.load(os.path.join(path, "codes.npy"))
+        if info["quantization"] == "int8":
+            scales = np.load(os.path.join(path, "scales.npy"))
+
+        return cls(
+            path=path,
+            dimension=info["dimension"],
+            quantization=info["quantization"],
+            records=records,
+            vectors=vectors,
+            codes=codes,
+            scales=scales,
+            metadata_index=MetadataIndex.load(path, records),
+        )
+
+    def memory_bytes(self) -> int:
+        """
+        Bytes held in RAM for candidate search (codes and scales).
+
+        Records and float vectors are memory-mapped and read per hit, so
+        they count toward disk_bytes instead.
+        """
+        if self.quantization == "none":
+            return int(self.vectors.size * self.vectors.itemsize)
+        total = int(self.codes.nbytes)
+        if self.scales is not None:
+            total += int(self.scales.nbytes)
+        return total
+
+    def disk_bytes(self) -> int:
+        """Bytes of memory-mapped float vectors and records kept on disk."""
+        return int(self.vectors.size * self.vectors.itemsize) + self.records.disk_bytes()
+
+    def search(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        rescore: bool = True,
+        rescore_multiplier: int = 4,
+        filter: Optional[dict] = None,
+    ) -> List[dict]:
+        """
+        Find the nearest records to a query embedding.
+
+        Args:
+            vector: Query embedding
+            top_k: Number of hits to return
+            rescore: Rescore candidates against the float vectors
+            rescore_multiplier: Candidates kept for rescoring = top_k * multiplier
+            filter: Pinecone-style metadata filter, applied before any vector is scored
+
+        Returns:
+            Hits shaped like Pinecone search results: {"_id", "_score", "fields"}
+        """
+        query = _normalize(np.asarray([vector], dtype=np.float32))[0]
+        subset = self.metadata_index.rows(filter) if filter else None
+
+        if self.quantization == "none":
+            positions = _top_indices(self._scan_float(query, subset), top_k)
+            rows = positions if subset is None else subset[positions]
+            scores = self._exact_scores(query, rows)
+        else:
+            num_candidates = top_k * rescore_multiplier if rescore else top_k
+            candidate_scores = self._scan_codes(query, subset)
+            positions = _top_indices(candidate_scores, num_candidates)
+            rows = positions if subset is None else subset[positions]
+            if rescore:
+                exact = self._exact_scores(query, rows)
+                order = np.argsort(-exact)[:top_k]
+                rows, scores = rows[order], exact[order]
+            else:
+                scores = candidate_scores[positions]
+
+        return [self._hit(int(row), float(score)) for row, score in zip(rows, scores)]
+
+    def _blocks(self, array: np.ndarray, subset: Optional[np.ndarray]):
+        """Yield (offset, block) over all rows of `array`, or only the `subset` rows."""
+        count = len(self) if subset is None else len(subset)
+        for start in range(0, count, _BLOCK_ROWS):
+            if subset is None:
+                yield start, array[start : start + _BLOCK_ROWS]
+            else:
+                yield start, array[subset[start : start + _BLOCK_ROWS]]
+
+    def _scan_float(
+        self, query: np.ndarray, subset: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Exact dot products against the float vectors, block by block."""
+        scores = np.empty(len(self) if subset is None else len(subset), dtype=np.float32)
+        for start, block in self._blocks(self.vectors, subset):
+            scores[start : start + len(block)] = block @ query
+        return scores
+
+    def _scan_codes(
+        self, query: np.ndarray, subset: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Approximate cosine scores from the quantized codes.
+
+        int8 folds the per-dimension scales into the query, quantizes it to
+        int8 as well and takes integer dot products. binary maps the Hamming
+        distance between sign bits to an angle estimate.
+        """
+        scores = np.empty(len(self) if subset is None else len(subset), dtype=np.float32)
+        if self.quantization == "int8":
+            weighted = query * self.scales
+            query_scale = float(np.abs(weighted).max()) / 127.0 or 1.0
+            q = np.round(weighted / query_scale).astype(np.int32)
+            for start, block in self._blocks(self.codes, subset):
+                scores[start : start + len(block)] = (block.astype(np.int32) @ q) * query_scale
+        else:
+            q = np.packbits(query > 0)
+            for start, block in self._blocks(self.codes, subset):
+                hamming = _POPCOUNT[np.bitwise_xor(block, q)].sum(axis=1, dtype=np.int32)
+                # Hamming distance h over d bits ~ angle pi * h / d
+                scores[start : start + len(block)] = np.cos(np.pi * hamming / self.dimension)
+        return scores
+
+    def _exact_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact cosine scores for selected rows, read from the memory map."""
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float32)
+        # Read rows in disk order, then restore the caller's order
+        order = np.argsort(rows)
+        scores = np.empty(len(rows), dtype=np.float32)
+        scores[order] = self.vectors[rows[order]] @ query
+        return scores
+
+    def _hit(self, row: int, score: float) -> dict:
+        """Build a Pinecone-shaped hit for a row, reading its record from disk."""
+        record = self.records[row]
+        fields = {k: v for k, v in record.items() if k != "_id"}
+        return {"_id": record["_id"], "_score": score, "fields": fields}
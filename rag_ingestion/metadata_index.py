@@ -0,0 +1,326 @@
+"""
+Bitmap metadata index for filtered local search.
+
+Built at index time from the record fields the ingesters write:
+- Categorical fields (type, filename, section, thread_id, author, ...) get one
+  row set per distinct value (packed NumPy bitmap or sorted row-id array)
+- Range fields (timestamp) get a sorted array of values with their row ids
+
+Filters use Pinecone's metadata filter syntax and evaluate to a bitmap of
+matching rows, so vectors are only scored for rows that pass the filter:
+
+    {"thread_id": "thread-sleep-solutions", "timestamp": {"$gte": "2025-03-01"}}
+    {"$or": [{"type": "article"}, {"author": {"$in": ["PositivityPat"]}}]}
+
+Fields that are not indexed fall back to a row-by-row scan of the records.
+A malformed filter (unknown operator, or an operand of the wrong type such
+as a list for $eq or a string for $in) raises ValueError.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CATEGORICAL_FIELDS = ("type", "filename", "section", "thread_id", "author", "url", "post_id")
+RANGE_FIELDS = ("timestamp",)
+
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+_SCALAR_TYPES = (str, int, float, bool)
+
+
+def validate_filter(filter: Any) -> None:
+    """
+    Check a Pinecone-style filter's structure and operand types.
+
+    Raises:
+        ValueError: Unknown operator or an operand of the wrong type
+    """
+    if not isinstance(filter, dict):
+        raise ValueError(f"Filter must be an object, got {filter!r}")
+    for key, condition in filter.items():
+        if key in ("$and", "$or"):
+            if not isinstance(condition, list):
+                raise ValueError(f"'{key}' needs a list of filters, got {condition!r}")
+            for clause in condition:
+                validate_filter(clause)
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator '{key}'")
+        elif isinstance(condition, dict):
+            for operator, value in condition.items():
+                _validate_operand(key, operator, value)
+        else:
+            _validate_operand(key, "$eq", condition)
+
+
+def _validate_operand(field: str, operator: str, value: Any) -> None:
+    if operator in ("$eq", "$ne"):
+        if not isinstance(value, _SCALAR_TYPES):
+            raise ValueError(f"'{operator}' on '{field}' needs a string, number or boolean, got {value!r}")
+    elif operator in ("$in", "$nin"):
+        if not isinstance(value, list) or not all(isinstance(item, _SCALAR_TYPES) for item in value):
+            raise ValueError(
+                f"'{operator}' on '{field}' needs a list of strings, numbers or booleans, got {value!r}"
+            )
+    elif operator == "$exists":
+        if not isinstance(value, bool):
+            raise ValueError(f"'$exists' on '{field}' needs a boolean, got {value!r}")
+    elif operator in _RANGE_OPERATORS:
+        if _to_number(value) is None:
+            raise ValueError(f"Range filter on '{field}' needs a number or ISO timestamp, got {value!r}")
+    else:
+        raise ValueError(f"Unsupported filter operator '{operator}' on '{field}'")
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """Convert a range value (number or ISO-8601 timestamp) to a float."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+class MetadataIndex:
+    """
+    Per-value row sets for categorical fields and sorted arrays for range fields.
+
+    Like roaring bitmaps, each value's rows are kept as a sorted row-id array
+    when sparse and as a packed bitmap when dense, so high-cardinality fields
+    such as post_id stay small.
+    """
+
+    def __init__(
+        self,
+        num_rows: int,
+        postings: Dict[str, tuple],
+        ranges: Dict[str, tuple],
+        records: Optional[Sequence[dict]] = None,
+    ):
+        self.num_rows = num_rows
+        self.ranges = ranges  # field -> (sorted values, row ids)
+        self.records = records or []
+        self._nbytes = (num_rows + 7) // 8
+
+        # field -> value -> packed bitmap (dense values) or row-id array (sparse values)
+        self.containers: Dict[str, Dict[Any, np.ndarray]] = {}
+        for field, (values, offsets, rows) in postings.items():
+            self.containers[field] = {}
+            for i, value in enumerate(values):
+                value_rows = rows[offsets[i]:offsets[i + 1]]
+                # A packed bitmap costs num_rows / 8 bytes, a row array 4 bytes per row
+                if len(value_rows) * 4 > self._nbytes:
+                    self.containers[field][value] = self._rows_to_bitmap(value_rows, num_rows)
+                else:
+                    self.containers[field][value] = value_rows
+        self._postings = postings
+
+    @classmethod
+    def build(cls, records: List[dict]) -> "MetadataIndex":
+        """Build the index from records as written by the ingesters."""
+        postings = {}
+        for field in CATEGORICAL_FIELDS:
+            rows_by_value: Dict[Any, List[int]] = {}
+            for row, record in enumerate(records):
+                if field in record:
+                    rows_by_value.setdefault(record[field], []).append(row)
+            if rows_by_value:
+                values = list(rows_by_value.keys())
+                offsets = np.cumsum([0] + [len(rows_by_value[v]) for v in values])
+                rows = np.concatenate(
+                    [np.asarray(rows_by_value[v], dtype=np.int32) for v in values]
+                )
+                postings[field] = (values, offsets, rows)
+
+        ranges = {}
+        for field in RANGE_FIELDS:
+            values, rows = [], []
+            for row, record in enumerate(records):
+                number = _to_number(record.get(field))
+                if number is not None:
+                    values.append(number)
+                    rows.append(row)
+            order = np.argsort(values, kind="stable")
+            ranges[field] = (
+                np.asarray(values, dtype=np.float64)[order],
+                np.asarray(rows, dtype=np.int64)[order],
+            )
+
+        return cls(len(records), postings, ranges, records)
+
+    def save(self, path: str) -> None:
+        """Write the index into an index directory."""
+        arrays = {}
+        values = {}
+        for field, (field_values, offsets, rows) in self._postings.items():
+            values[field] = field_values
+            arrays[f"offsets:{field}"] = offsets
+            arrays[f"rows:{field}"] = rows
+        for field, (sorted_values, rows) in self.ranges.items():
+            arrays[f"range_values:{field}"] = sorted_values
+            arrays[f"range_rows:{field}"] = rows
+
+        np.savez(os.path.join(path, "metadata_index.npz"), **arrays)
+        with open(os.path.join(path, "metadata_index.json"), "w", encoding="utf-8") as f:
+            json.dump({"num_rows": self.num_rows, "values": values}, f)
+
+    @classmethod
+    def load(cls, path: str, records: Optional[Sequence[dict]] = None) -> "MetadataIndex":
+        """Load an index saved with `save`."""
+        with open(os.path.join(path, "metadata_index.json"), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        arrays = np.load(os.path.join(path, "metadata_index.npz"))
+
+        postings = {
+            field: (values, arrays[f"offsets:{field}"], arrays[f"rows:{field}"])
+            for field, values in info["values"].items()
+        }
+        ranges = {
+            field: (arrays[f"range_values:{field}"], arrays[f"range_rows:{field}"])
+            for field in RANGE_FIELDS
+            if f"range_values:{field}" in arrays
+        }
+        return cls(info["num_rows"], postings, ranges, records)
+
+    def evaluate(self, filter: dict) -> np.ndarray:
+        """Evaluate a Pinecone-style filter dict to a packed bitmap of rows.
+
+        Raises:
+            ValueError: The filter is malformed (see `validate_filter`)
+        """
+        validate_filter(filter)
+        return self._evaluate(filter)
+
+    def _evaluate(self, filter: dict) -> np.ndarray:
+        result = self._all()
+        for key, condition in filter.items():
+            if key == "$and":
+                for clause in condition:
+                    result &= self._evaluate(clause)
+            elif key == "$or":
+                matched = self._none()
+                for clause in condition:
+                    matched |= self._evaluate(clause)
+                result &= matched
+            else:
+                result &= self._evaluate_field(key, condition)
+        return result
+
+    def rows(self, filter: dict) -> np.ndarray:
+        """Row ids matching a filter, in ascending order."""
+        return self.bitmap_to_rows(self.evaluate(filter))
+
+    def bitmap_to_rows(self, bitmap: np.ndarray) -> np.ndarray:
+        """Unpack a bitmap to ascending row ids."""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.num_rows))
+
+    def _evaluate_field(self, field: str, condition: Any) -> np.ndarray:
+        """Evaluate the condition on a single field."""
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        result = self._all()
+        for operator, value in condition.items():
+            if operator == "$eq":
+                result &= self._equals(field, value)
+            elif operator == "$ne":
+                result &= self._invert(self._equals(field, value))
+            elif operator == "$in":
+                matched = self._none()
+                for item in value:
+                    matched |= self._equals(field, item)
+                result &= matched
+            elif operator == "$nin":
+                for item in value:
+                    result &= self._invert(self._equals(field, item))
+            elif operator == "$exists":
+                exists = self._exists(field)
+                result &= exists if value else self._invert(exists)
+            else:  # A range operator; validate_filter rejected anything else
+                result &= self._range(field, operator, value)
+        return result
+
+    def _equals(self, field: str, value: Any) -> np.ndarray:
+        if field in self.containers:
+            container = self.containers[field].get(value)
+            return self._container_bitmap(container)
+        return self._scan(lambda record: field in record and record[field] == value)
+
+    def _exists(self, field: str) -> np.ndarray:
+        if field in self.containers:
+            result = self._none()
+            for container in self.containers[field].values():
+                result |= self._container_bitmap(container)
+            return result
+        return self._scan(lambda record: field in record)
+
+    def _container_bitmap(self, container: Optional[np.ndarray]) -> np.ndarray:
+        """A fresh packed bitmap for a value's container."""
+        if container is None:
+            return self._none()
+        if container.dtype == np.uint8:
+            return container.copy()
+        return self._rows_to_bitmap(container, self.num_rows)
+
+    def _range(self, field: str, operator: str, value: Any) -> np.ndarray:
+        bound = _to_number(value)
+        if field not in self.ranges:
+            def matches(record):
+                number = _to_number(record.get(field))
+                return number is not None and self._compare(number, operator, bound)
+            return self._scan(matches)
+
+        sorted_values, rows = self.ranges[field]
+        if operator == "$gt":
+            selected = rows[np.searchsorted(sorted_values, bound, side="right"):]
+        elif operator == "$gte":
+            selected = rows[np.searchsorted(sorted_values, bound, side="left"):]
+        elif operator == "$lt":
+            selected = rows[:np.searchsorted(sorted_values, bound, side="left")]
+        else:
+            selected = rows[:np.searchsorted(sorted_values, bound, side="right")]
+        return self._rows_to_bitmap(selected, self.num_rows)
+
+    @staticmethod
+    def _compare(number: float, operator: str, bound: float) -> bool:
+        return {
+            "$gt": number > bound,
+            "$gte": number >= bound,
+            "$lt": number < bound,
+            "$lte": number <= bound,
+        }[operator]
+
+    def _scan(self, predicate) -> np.ndarray:
+        """Fallback for unindexed fields: test every record."""
+        rows = [row for row, record in enumerate(self.records) if predicate(record)]
+        return self._rows_to_bitmap(rows, self.num_rows)
+
+    @staticmethod
+    def _rows_to_bitmap(rows, num_rows: int) -> np.ndarray:
+        bits = np.zeros(num_rows, dtype=bool)
+        bits[np.asarray(rows, dtype=np.int64)] = True
+        return np.packbits(bits)
+
+    def _all(self) -> np.ndarray:
+        return self._invert(self._none())
+
+    def _none(self) -> np.ndarray:
+        return np.zeros(self._nbytes, dtype=np.uint8)
+
+    def _invert(self, bitmap: np.ndarray) -> np.ndarray:
+        """Complement a bitmap, keeping the padding bits past num_rows clear."""
+        result = np.invert(bitmap)
+        tail = self.num_rows % 8
+        if tail:
+            result[-1] &= np.uint8((0xFF << (8 - tail)) & 0xFF)
+        return result
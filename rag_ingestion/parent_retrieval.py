@@ -0,0 +1,82 @@
+"""
+Resolve child-chunk hits to their parent sections (hierarchical mode).
+
+Small child chunks give precise matches; this swaps them for the full
+parent sections from the local docstore, deduplicated and ordered by the
+best child score. Hits without a parent_id (thread posts, flat article
+chunks) pass through unchanged, and a parent missing from the docstore
+falls back to its best-scoring child chunk.
+"""
+
+from typing import List, Optional
+
+from docstore import SectionDocstore
+
+
+def resolve_parents(
+    hits: List[dict], docstore: SectionDocstore, top_n: Optional[int] = None
+) -> List[dict]:
+    """
+    Replace child hits with their deduplicated parent sections.
+
+    Args:
+        hits: Search hits ({"_id", "_score", "fields"}) or flat records
+        docstore: Docstore holding the parent sections
+        top_n: Maximum number of results to return (None keeps all)
+
+    Returns:
+        Hits in the same shape, one per parent section, best score first.
+        Each parent hit lists the matching child IDs in fields["child_ids"].
+        A parent the docstore doesn't have keeps its best child's own text.
+    """
+    results: List[dict] = []
+    by_parent = {}
+    best_child = {}
+
+    for hit in sorted(hits, key=lambda h: -float(h.get("_score", 0.0))):
+        fields = hit.get("fields", hit)
+        parent_id = fields.get("parent_id")
+        if not parent_id:
+            results.append(hit)
+            continue
+        if parent_id in by_parent:
+            by_parent[parent_id]["fields"]["child_ids"].append(hit.get("_id", ""))
+            continue
+        parent_hit = {
+            "_id": parent_id,
+            "_score": float(hit.get("_score", 0.0)),
+            "fields": {"child_ids": [hit.get("_id", "")]},
+        }
+        by_parent[parent_id] = parent_hit
+        best_child[parent_id] = fields
+        results.append(parent_hit)
+
+    sections = docstore.get_many(list(by_parent))
+    resolved = []
+    for result in results:
+        parent_id = result["_id"]
+        if parent_id not in by_parent:
+            resolved.append(result)
+            continue
+        section = sections.get(parent_id)
+        if section is None:
+            # Docstore out of sync with the index; the child chunk is still a match
+            result["_id"] = result["fields"]["child_ids"][0]
+            result["fields"].update(
+                {key: value for key, value in best_child[parent_id].items() if key != "child_ids"}
+            )
+            resolved.append(result)
+            continue
+        result["fields"].update({
+            "type": "article",
+            "text": section.text,
+            "title": section.title,
+            "url": section.url,
+            "filename": section.filename,
+            "section": section.section,
+            "section_index": section.section_index,
+            "chunk_index": 0,
+        })
+        resolved.append(result)
+
+    return resolved[:top_n] if top_n is not None else resolved
@@ -0,0 +1,170 @@
+"""
+Shared bootstrap for the Pinecone indexes the ingesters, rebuilds and bulk
+imports write to.
+
+Two index kinds are used:
+
+- integrated: created with integrated embedding (multilingual-e5-large over
+  the `text` field). The ingesters upsert text records and searches send
+  query text; Pinecone embeds both.
+- dense: a plain 1024-dim cosine serverless index holding pre-computed
+  vectors. Bulk import only supports these, so imported indexes are dense;
+  searches embed the query with Pinecone inference and query by vector.
+
+Control-plane and upsert calls back off and retry on rate limits (429) and
+server errors (5xx), like any other call to a shared service.
+"""
+
+import logging
+import random
+import time
+from typing import Callable, List, TypeVar
+
+from pinecone import Pinecone, ServerlessSpec
+
+from config import PineconeConfig
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 5
+
+T = TypeVar("T")
+
+
+def with_retries(
+    call: Callable[[], T], what: str, max_retries: int = MAX_RETRIES, conflict_means_done: bool = False
+) -> T:
+    """
+    Run a Pinecone call, backing off on rate limits (429) and server errors (5xx).
+
+    Args:
+        call: The call to make
+        what: Description for the retry log lines
+        max_retries: Retries after the first attempt
+        conflict_means_done: Treat a 409 on a retry as success, for creates
+            whose earlier attempt went through but whose response was lost
+
+    Returns:
+        The call's result (None for a create settled by a 409)
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            status = getattr(e, "status", None) or getattr(e, "status_code", None)
+            if conflict_means_done and status == 409 and attempt > 0:
+                logger.info(f"{what}: already done by an earlier attempt")
+                return None
+            retryable = status == 429 or (isinstance(status, int) and status >= 500)
+            if not retryable or attempt == max_retries:
+                raise
+            delay = min(2 ** attempt, 30) * (0.5 + random.random() / 2)
+            logger.warning(
+                f"{what} failed with status {status}, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{max_retries})"
+            )
+            time.sleep(delay)
+
+
+def upsert_batch(index, namespace: str, batch: List[dict], max_retries: int = MAX_RETRIES) -> None:
+    """Upsert one batch of text records, retrying on 429 and 5xx."""
+    with_retries(
+        lambda: index.upsert_records(namespace=namespace, records=batch), "Upsert", max_retries
+    )
+
+
+def list_index_names(pc: Pinecone) -> List[str]:
+    return [idx.name for idx in with_retries(pc.list_indexes, "list_indexes")]
+
+
+def resolve_index_name(pc: Pinecone, config: PineconeConfig) -> str:
+    """The alias's physical index; refuses to fall back to the bare alias name
+    when versioned indexes exist but the alias registry doesn't know them."""
+    return config.resolve_index_name(list_index_names(pc))
+
+
+def get_or_create_index(pc: Pinecone, config: PineconeConfig, index_name: str):
+    """
+    Get an integrated-embedding index handle, creating the index if needed.
+
+    Args:
+        pc: Pinecone client
+        config: Cloud, region and embedding model for a new index
+        index_name: Physical index name (resolve aliases before calling)
+
+    Returns:
+        Index handle for data-plane calls
+
+    Raises:
+        EnvironmentError: The index exists but is a dense index, which
+            can't take text records
+    """
+    if index_name not in list_index_names(pc):
+        logger.info(f"Creating index '{index_name}' with integrated embedding...")
+        logger.info(f"  Embedding model: {config.embedding_model}")
+
+        # Create index with integrated embedding
+        with_retries(
+            lambda: pc.create_index_for_model(
+                name=index_name,
+                cloud=config.cloud,
+                region=config.region,
+                embed={
+                    "model": config.embedding_model,
+                    "field_map": {"text": "text"},  # Map 'text' field to be embedded
+                },
+            ),
+            "create_index_for_model",
+            conflict_means_done=True,
+        )
+        _wait_until_ready(pc, index_name)
+    else:
+        if not is_integrated(pc, index_name):
+            raise EnvironmentError(
+                f"Index '{index_name}' is a dense (bulk-imported) index and can't take text "
+                "records; run rebuild_index.py to build an integrated version"
+            )
+        logger.info(f"Using existing index '{index_name}'")
+
+    return pc.Index(index_name)
+
+
+def create_dense_index(pc: Pinecone, config: PineconeConfig, index_name: str):
+    """
+    Create a dense serverless index for pre-computed vectors and return its handle.
+
+    Raises:
+        EnvironmentError: An index with this name already exists
+    """
+    if index_name in list_index_names(pc):
+        raise EnvironmentError(f"Index '{index_name}' already exists; bulk import needs a new index")
+
+    logger.info(f"Creating dense index '{index_name}' ({config.dimension} dims, cosine)...")
+    with_retries(
+        lambda: pc.create_index(
+            name=index_name,
+            dimension=config.dimension,
+            metric="cosine",
+            spec=ServerlessSpec(cloud=config.cloud, region=config.region),
+        ),
+        "create_index",
+        conflict_means_done=True,
+    )
+    _wait_until_ready(pc, index_name)
+    return pc.Index(index_name)
+
+
+def is_integrated(pc: Pinecone, index_name: str) -> bool:
+    """Whether an index embeds text itself (integrated) or stores given vectors (dense)."""
+    desc = with_retries(lambda: pc.describe_index(index_name), "describe_index")
+    return bool(getattr(desc, "embed", None))
+
+
+def _wait_until_ready(pc: Pinecone, index_name: str) -> None:
+    logger.info("Waiting for index to be ready...")
+    while True:
+        desc = with_retries(lambda: pc.describe_index(index_name), "describe_index")
+        if desc.status.ready:
+            break
+        time.sleep(2)
+    logger.info(f"Index '{index_name}' created and ready!")
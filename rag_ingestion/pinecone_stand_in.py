@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Pinecone endpoints the ingesters call.
+
+Serves both the control plane and the data plane from one local port so
+ingestion can be load-tested without touching the real service or quota:
+
+Control plane:
+    GET    /indexes                               list_indexes
+    POST   /indexes                               create_index (dense)
+    POST   /indexes/create-for-model              create_index_for_model
+    GET    /indexes/{name}                        describe_index
+    DELETE /indexes/{name}                        delete_index
+
+Data plane (every index's "host" points back at this server):
+    POST   /records/namespaces/{namespace}/upsert upsert_records (NDJSON)
+    POST   /records/namespaces/{namespace}/search search (word-overlap scoring)
+    POST   /describe_index_stats                  describe_index_stats
+
+Stand-in control:
+    GET    /_stand_in/requests                    Recorded requests
+    POST   /_stand_in/reset                       Clear records, indexes and recordings
+
+Fault injection (StandInConfig): per-request latency drawn from a lognormal
+distribution, random 429 and 5xx responses on both the control and the data
+plane, and a per-minute embedding token quota that answers 429 once
+exhausted.
+
+Usage:
+    python pinecone_stand_in.py --port 5080 --rate-429 0.05 --tokens-per-minute 250000
+    export PINECONE_CONTROLLER_HOST=http://127.0.0.1:5080
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StandInConfig:
+    """Latency and fault injection settings for the stand-in."""
+    latency_ms: float = 50.0  # Median per-request latency
+    latency_sigma: float = 0.5  # Lognormal shape; 0 gives a fixed latency
+    rate_429: float = 0.0  # Fraction of control- and data-plane requests answered with 429
+    rate_5xx: float = 0.0  # Fraction of control- and data-plane requests answered with 503
+    tokens_per_minute: int = 0  # Embedding token quota per minute; 0 disables it
+    ready_after_s: float = 1.0  # Seconds before a new index reports ready
+    seed: Optional[int] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for quota accounting."""
+    return max(1, len(text) // 4)
+
+
+class StandInState:
+    """Indexes, records, quota window and request recordings, shared by handler threads."""
+
+    def __init__(self, config: StandInConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.indexes: Dict[str, dict] = {}
+        self.created_at: Dict[str, float] = {}
+        self.namespaces: Dict[str, Dict[str, dict]] = {}
+        self.token_window: Deque[Tuple[float, int]] = deque()
+        self.recordings: List[dict] = []
+
+    def reset(self) -> None:
+        with self.lock:
+            self.indexes.clear()
+            self.created_at.clear()
+            self.namespaces.clear()
+            self.token_window.clear()
+            self.recordings.clear()
+
+    def sample_latency(self) -> float:
+        """Per-request latency in seconds."""
+        with self.lock:
+            if self.config.latency_sigma <= 0:
+                latency_ms = self.config.latency_ms
+            else:
+                latency_ms = self.random.lognormvariate(0.0, self.config.latency_sigma) * self.config.latency_ms
+        return latency_ms / 1000.0
+
+    def injected_status(self) -> Optional[int]:
+        """Status code to inject for a control- or data-plane request, if any."""
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.config.rate_429:
+            return 429
+        if roll < self.config.rate_429 + self.config.rate_5xx:
+            return 503
+        return None
+
+    def consume_tokens(self, tokens: int) -> bool:
+        """Charge tokens against the per-minute quota; False if it is exhausted."""
+        if self.config.tokens_per_minute <= 0:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self.token_window and now - self.token_window[0][0] >= 60.0:
+                self.token_window.popleft()
+            used = sum(count for _, count in self.token_window)
+            if used + tokens > self.config.tokens_per_minute:
+                return False
+            self.token_window.append((now, tokens))
+            return True
+
+    def describe(self, name: str) -> Optional[dict]:
+        """Index description, flipping to ready once ready_after_s has passed.
+        None if the index has been deleted. Callers must not hold the lock."""
+        with self.lock:
+            if name not in self.indexes:
+                return None
+            ready = time.monotonic() - self.created_at[name] >= self.config.ready_after_s
+            desc = dict(self.indexes[name])
+        desc["status"] = {"ready": ready, "state": "Ready" if ready else "Initializing"}
+        return desc
+
+    def record(self, entry: dict) -> None:
+        with self.lock:
+            self.recordings.append(entry)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes Pinecone REST calls to the shared StandInState."""
+
+    protocol_version = "HTTP/1.1"
+    state: StandInState  # Set on the subclass created by make_server
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        started = time.monotonic()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0]
+
+        records, tokens = 0, 0
+        if path.startswith("/_stand_in/"):
+            status, payload = self._stand_in(method, path)
+        elif path.startswith("/indexes"):
+            time.sleep(self.state.sample_latency())
+            status, payload = self._control(method, path, body)
+        else:
+            time.sleep(self.state.sample_latency())
+            status, payload, records, tokens = self._data(method, path, body)
+
+        self._send(status, payload)
+        if not path.startswith("/_stand_in/"):
+            self.state.record({
+                "time": time.time(),
+                "method": method,
+                "path": path,
+                "status": status,
+                "latency_ms": (time.monotonic() - started) * 1000.0,
+                "records": records,
+                "tokens": tokens,
+            })
+
+    def _control(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        state = self.state
+        injected = state.injected_status()
+        if injected == 429:
+            return 429, _error("RESOURCE_EXHAUSTED", "Injected rate limit")
+        if injected:
+            return injected, _error("UNAVAILABLE", "Injected server error")
+
+        if method == "GET" and path == "/indexes":
+            with state.lock:
+                names = list(state.indexes)
+            descs = [state.describe(name) for name in names]
+            return 200, {"indexes": [desc for desc in descs if desc is not None]}
+
+        if method == "POST" and path in ("/indexes", "/indexes/create-for-model"):
+            request = json.loads(body or b"{}")
+            name = request.get("name", "")
+            with state.lock:
+                if name in state.indexes:
+                    return 409, _error("ALREADY_EXISTS", f"Resource {name} already exists")
+                if path == "/indexes":
+                    embed = None
+                    dimension = request.get("dimension", 1024)
+                    metric = request.get("metric", "cosine")
+                    spec = request.get("spec") or {"serverless": {"cloud": "aws", "region": "us-east-1"}}
+                else:
+                    embed = dict(request.get("embed") or {})
+                    embed.setdefault("dimension", 1024)
+                    embed.setdefault("metric", "cosine")
+                    dimension, metric = embed["dimension"], embed["metric"]
+                    spec = {"serverless": {
+                        "cloud": request.get("cloud", "aws"),
+                        "region": request.get("region", "us-east-1"),
+                    }}
+                state.indexes[name] = {
+                    "name": name,
+                    "dimension": dimension,
+                    "metric": metric,
+                    "host": state.base_url,
+                    "vector_type": "dense",
+                    "deletion_protection": request.get("deletion_protection", "disabled"),
+                    "tags": request.get("tags"),
+                    "spec": spec,
+                }
+                if embed is not None:
+                    state.indexes[name]["embed"] = embed
+                state.created_at[name] = time.monotonic()
+            return 201, state.describe(name)
+
+        match = re.fullmatch(r"/indexes/([^/]+)", path)
+        if match:
+            name = match.group(1)
+            with state.lock:
+                exists = name in state.indexes
+                if exists and method == "DELETE":
+                    del state.indexes[name]
+                    del state.created_at[name]
+                    return 202, {}
+            desc = state.describe(name) if exists and method == "GET" else None
+            if not exists or (method == "GET" and desc is None):  # Possibly deleted meanwhile
+                return 404, _error("NOT_FOUND", f"Resource {name} not found")
+            if method == "GET":
+                return 200, desc
+
+        return 404, _error("NOT_FOUND", f"No route for {method} {path}")
+
+    def _data(self, method: str, path: str, body: bytes) -> Tuple[int, dict, int, int]:
+        state = self.state
+        injected = state.injected_status()
+        if injected == 429:
+            return 429, _error("RESOURCE_EXHAUSTED", "Injected rate limit"), 0, 0
+        if injected:
+            return injected, _error("UNAVAILABLE", "Injected server error"), 0, 0
+
+        match = re.fullmatch(r"/records/namespaces/([^/]+)/upsert", path)
+        if method == "POST" and match:
+            namespace = match.group(1)
+            lines = [line for line in body.decode("utf-8").splitlines() if line.strip()]
+            try:
+                records = [json.loads(line) for line in lines]
+            except json.JSONDecodeError as e:
+                return 400, _error("INVALID_ARGUMENT", f"Invalid NDJSON: {e}"), 0, 0
+
+            tokens = sum(estimate_tokens(str(record.get("text", ""))) for record in records)
+            if not state.consume_tokens(tokens):
+                return 429, _error("RESOURCE_EXHAUSTED", "Embedding token quota exceeded"), 0, tokens
+
+            with state.lock:
+                stored = state.namespaces.setdefault(namespace, {})
+                for record in records:
+                    stored[record.get("_id") or record.get("id")] = record
+            return 201, {}, len(records), tokens
+
+        match = re.fullmatch(r"/records/namespaces/([^/]+)/search", path)
+        if method == "POST" and match:
+            request = json.loads(body or b"{}").get("query", {})
+            text = str(request.get("inputs", {}).get("text", ""))
+            top_k = int(request.get("top_k", 10))
+            tokens = estimate_tokens(text)
+            if not state.consume_tokens(tokens):
+                return 429, _error("RESOURCE_EXHAUSTED", "Embedding token quota exceeded"), 0, tokens
+
+            # Filters are ignored; the stand-in only needs plausible hits
+            words = set(text.lower().split())
+            with state.lock:
+                stored = list(state.namespaces.get(match.group(1), {}).values())
+            scored = sorted(
+                (
+                    (len(words & set(str(r.get("text", "")).lower().split())) / (len(words) or 1), r)
+                    for r in stored
+                ),
+                key=lambda pair: -pair[0],
+            )[:top_k]
+            hits = [
+                {
+                    "_id": record.get("_id") or record.get("id"),
+                    "_score": score,
+                    "fields": {k: v for k, v in record.items() if k not in ("_id", "id")},
+                }
+                for score, record in scored
+            ]
+            return 200, {"result": {"hits": hits}, "usage": {"read_units": 1}}, len(hits), tokens
+
+        if method == "POST" and path == "/describe_index_stats":
+            with state.lock:
+                namespaces = {
+                    name: {"vector_count": len(records)}
+                    for name, records in state.namespaces.items()
+                }
+            return 200, {
+                "namespaces": namespaces,
+                "dimension": 1024,
+                "index_fullness": 0.0,
+                "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+            }, 0, 0
+
+        return 404, _error("NOT_FOUND", f"No route for {method} {path}"), 0, 0
+
+    def _stand_in(self, method: str, path: str) -> Tuple[int, dict]:
+        if method == "GET" and path == "/_stand_in/requests":
+            with self.state.lock:
+                return 200, {"requests": list(self.state.recordings)}
+        if method == "POST" and path == "/_stand_in/reset":
+            self.state.reset()
+            return 200, {}
+        return 404, _error("NOT_FOUND", f"No route for {method} {path}")
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _error(code: str, message: str) -> dict:
+    """Error body in Pinecone's shape."""
+    return {"error": {"code": code, "message": message}, "status": 0}
+
+
+def make_server(
+    config: Optional[StandInConfig] = None, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a stand-in server.
+
+    Use port=0 to pick a free port; the bound URL is on `server.base_url` and
+    the shared state on `server.state`.
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    base_url = f"http://{host}:{server.server_address[1]}"
+    state = StandInState(config or StandInConfig(), base_url)
+    server.RequestHandlerClass = type("BoundStandInHandler", (StandInHandler,), {"state": state})
+    server.base_url = base_url
+    server.state = state
+    return server
+
+
+def start_in_background(
+    config: Optional[StandInConfig] = None, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """Start a stand-in server on a daemon thread and return it."""
+    server = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Local Pinecone stand-in with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5080)
+    parser.add_argument("--latency-ms", type=float, default=StandInConfig.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=StandInConfig.latency_sigma)
+    parser.add_argument("--rate-429", type=float, default=StandInConfig.rate_429)
+    parser.add_argument("--rate-5xx", type=float, default=StandInConfig.rate_5xx)
+    parser.add_argument("--tokens-per-minute", type=int, default=StandInConfig.tokens_per_minute)
+    parser.add_argument("--ready-after", type=float, default=StandInConfig.ready_after_s)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        tokens_per_minute=args.tokens_per_minute,
+        ready_after_s=args.ready_after,
+        seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port)
+    logger.info(f"Pinecone stand-in listening on {server.base_url}")
+    logger.info(f"  export PINECONE_CONTROLLER_HOST={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Lightweight query router: which namespaces to search, and how to split top_k.
+
+Every query used to search both namespaces. Many want only one: "I need to
+hear from people who've dealt with..." wants peer experiences (threads),
+"What are the legal steps for..." wants professional guidance (articles).
+
+The router is a local keyword/centroid classifier built from the same chunks
+the ingesters upsert:
+
+- one TF-IDF centroid per namespace; a query's similarity to each centroid,
+  relative to the average chunk's similarity to it, gives the namespaces'
+  initial shares (so the chattier namespace doesn't win every query)
+- cue phrases ("has anyone", "other families" / "what are the signs",
+  "power of attorney") shift the share toward one namespace
+
+A namespace whose share reaches the router's threshold gets the whole top_k
+and the other is skipped; otherwise top_k is split by share. Skipping a
+namespace the query needed silently loses recall, so the threshold is
+calibrated on the evaluation questions when the router is built: it starts
+at `RouterConfig.single_namespace_share` and is raised above the share of
+every question that would have been narrowed to the wrong namespace. The
+calibrated threshold is saved with the router.
+
+Usage:
+    python query_router.py              # Build, calibrate and save the router
+    python query_router.py --evaluate   # Routing accuracy on the evaluation questions
+
+No Pinecone API key is needed; the router is built from the local dataset.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from config import (
+    get_path_config,
+    get_router_config,
+    PineconeConfig,
+    RouterConfig,
+)
+from corpus import load_corpus_records, load_evaluation_questions
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+# Phrases that ask for peer experience (threads) or professional guidance (articles)
+PEER_CUES = (
+    "people who", "anyone", "other families", "other caregivers", "others",
+    "hear from", "been through", "what worked", "experiences", "real stories",
+    "community", "how did you", "has anyone", "in the same boat",
+)
+GUIDANCE_CUES = (
+    "what are the", "signs", "symptoms", "options", "steps", "guide",
+    "legal", "power of attorney", "medicaid", "medicare", "insurance",
+    "research", "evidence", "recommended", "best practices", "explain",
+)
+
+# Function words and pronouns are dropped so centroids compare topics;
+# otherwise every first-person question looks like a community post
+STOPWORDS = frozenset(
+    "a an the and or but if of to in on at by for with from as is are was were be been "
+    "being this that these those it its there here than then so such can could would "
+    "should will shall may might must do does did done have has had not no "
+    "i i'm i've i'd i'll me my mine myself we we're we've us our ours you you're your "
+    "yours he he's him his she she's her hers they they're them their it's".split()
+)
+
+_WORD = re.compile(r"[a-z][a-z']*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords."""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _count_cues(text: str, cues: tuple) -> int:
+    lowered = " ".join(_WORD.findall(text.lower()))
+    return sum(1 for cue in cues if re.search(rf"\b{re.escape(cue)}\b", lowered))
+
+
+@dataclass
+class RouteDecision:
+    """Namespaces to search for a query, with each one's share of top_k."""
+    top_k: Dict[str, int]  # namespace -> top_k; skipped namespaces are absent
+    shares: Dict[str, float]  # namespace -> routing share (sums to 1)
+    cues: Dict[str, int] = field(default_factory=dict)  # namespace -> cue phrases matched
+
+    @property
+    def namespaces(self) -> List[str]:
+        return list(self.top_k)
+
+
+class QueryRouter:
+    """Routes queries between namespaces from TF-IDF centroids and cue phrases."""
+
+    def __init__(
+        self,
+        idf: Dict[str, float],
+        centroids: Dict[str, Dict[str, float]],
+        baselines: Dict[str, float],
+        cues: Dict[str, tuple],
+        config: Optional[RouterConfig] = None,
+        threshold: Optional[float] = None,
+    ):
+        self.idf = idf
+        self.centroids = centroids
+        self.baselines = baselines
+        self.cues = cues
+        self.config = config or get_router_config()
+        # Share at or above which only one namespace is searched (see calibrate)
+        self.threshold = threshold if threshold is not None else self.config.single_namespace_share
+
+    @classmethod
+    def build(
+        cls,
+        records_by_namespace: Dict[str, List[dict]],
+        cues: Dict[str, tuple],
+        config: Optional[RouterConfig] = None,
+    ) -> "QueryRouter":
+        """
+        Build from each namespace's upsert records.
+
+        Args:
+            records_by_namespace: Namespace -> records with a "text" field
+            cues: Namespace -> cue phrases that favour it
+            config: Routing thresholds
+        """
+        documents = {
+            namespace: [Counter(tokenize(record["text"])) for record in records]
+            for namespace, records in records_by_namespace.items()
+        }
+        total = sum(len(docs) for docs in documents.values())
+        document_frequency: Counter = Counter()
+        for docs in documents.values():
+            for doc in docs:
+                document_frequency.update(doc.keys())
+        idf = {
+            term: math.log((1 + total) / (1 + count)) + 1.0
+            for term, count in document_frequency.items()
+        }
+
+        centroids = {}
+        for namespace, docs in documents.items():
+            centroid: Counter = Counter()
+            for doc in docs:
+                for term, weight in _unit(_tfidf(doc, idf)).items():
+                    centroid[term] += weight
+            centroids[namespace] = _unit(dict(centroid))
+
+        # Mean similarity of every chunk (both namespaces) to each centroid
+        vectors = [_unit(_tfidf(doc, idf)) for docs in documents.values() for doc in docs]
+        baselines = {
+            namespace: sum(_dot(vector, centroid) for vector in vectors) / (len(vectors) or 1)
+            for namespace, centroid in centroids.items()
+        }
+        return cls(idf, centroids, baselines, cues, config)
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "idf": self.idf,
+                "centroids": self.centroids,
+                "baselines": self.baselines,
+                "cues": {namespace: list(cues) for namespace, cues in self.cues.items()},
+                "threshold": self.threshold,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, config: Optional[RouterConfig] = None) -> "QueryRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cues = {namespace: tuple(phrases) for namespace, phrases in data["cues"].items()}
+        return cls(
+            data["idf"], data["centroids"], data["baselines"], cues, config, data.get("threshold")
+        )
+
+    def shares(self, query: str) -> tuple:
+        """Each namespace's routing share (sums to 1) and matched cue phrases."""
+        namespaces = list(self.centroids)
+        vector = _unit(_tfidf(Counter(tokenize(query)), self.idf))
+        similarity = {
+            namespace: _dot(vector, self.centroids[namespace]) / (self.baselines[namespace] or 1.0)
+            for namespace in namespaces
+        }
+        total = sum(similarity.values())
+        shares = {
+            namespace: similarity[namespace] / total if total else 1.0 / len(namespaces)
+            for namespace in namespaces
+        }
+
+        # Each cue phrase moves cue_weight of share toward its namespace
+        cue_counts = {namespace: _count_cues(query, self.cues.get(namespace, ())) for namespace in namespaces}
+        for namespace, count in cue_counts.items():
+            for other in namespaces:
+                if other == namespace:
+                    continue
+                moved = min(shares[other], count * self.config.cue_weight / (len(namespaces) - 1))
+                shares[other] -= moved
+                shares[namespace] += moved
+        return shares, cue_counts
+
+    def route(self, query: str, top_k: int) -> RouteDecision:
+        """Decide which namespaces to search and how many results to take from each."""
+        namespaces = list(self.centroids)
+        shares, cue_counts = self.shares(query)
+        best = max(namespaces, key=lambda namespace: shares[namespace])
+        if shares[best] >= self.threshold or top_k < len(namespaces):
+            return RouteDecision({best: top_k}, shares, cue_counts)
+
+        # Largest-remainder split, at least one result per namespace searched
+        exact = {namespace: shares[namespace] * top_k for namespace in namespaces}
+        split = {namespace: max(1, int(exact[namespace])) for namespace in namespaces}
+        by_remainder = sorted(namespaces, key=lambda n: exact[n] - int(exact[n]), reverse=True)
+        i = 0
+        while sum(split.values()) < top_k:
+            split[by_remainder[i % len(namespaces)]] += 1
+            i += 1
+        while sum(split.values()) > top_k:
+            largest = max(namespaces, key=lambda namespace: split[namespace])
+            split[largest] -= 1
+        return RouteDecision(split, shares, cue_counts)
+
+
+def _tfidf(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    # Sublinear term frequency; terms never seen at build time are dropped
+    return {term: (1.0 + math.log(count)) * idf[term] for term, count in counts.items() if term in idf}
+
+
+def _dot(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def _unit(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def default_cues(pinecone_config: PineconeConfig) -> Dict[str, tuple]:
+    return {
+        pinecone_config.articles_namespace: GUIDANCE_CUES,
+        pinecone_config.threads_namespace: PEER_CUES,
+    }
+
+
+def build_router(pinecone_config: PineconeConfig, config: Optional[RouterConfig] = None) -> QueryRouter:
+    """Build a router from the same records the ingesters upsert."""
+    corpus = load_corpus_records()
+    return QueryRouter.build(
+        {
+            pinecone_config.articles_namespace: corpus["articles"],
+            pinecone_config.threads_namespace: corpus["threads"],
+        },
+        default_cues(pinecone_config),
+        config,
+    )
+
+
+def expected_namespaces(question: dict, pinecone_config: PineconeConfig) -> List[str]:
+    """Namespaces holding a question's expected sources (article or community URLs)."""
+    namespaces = []
+    sources = question.get("expected_sources", [])
+    if any("/resources/" in url for url in sources):
+        namespaces.append(pinecone_config.articles_namespace)
+    if any("/community/" in url for url in sources):
+        namespaces.append(pinecone_config.threads_namespace)
+    return namespaces
+
+
+def calibrate(
+    router: QueryRouter, questions: List[dict], pinecone_config: PineconeConfig
+) -> float:
+    """
+    Raise the router's single-namespace threshold until no evaluation question
+    is narrowed to a namespace set other than its expected one.
+
+    Returns:
+        The calibrated threshold (above 1.0 means never narrow)
+    """
+    threshold = router.config.single_namespace_share
+    for question in questions:
+        expected = set(expected_namespaces(question, pinecone_config))
+        if not expected:
+            continue
+        shares, _ = router.shares(question["question"])
+        best = max(shares, key=lambda namespace: shares[namespace])
+        if expected != {best}:
+            threshold = max(threshold, shares[best] + 1e-6)
+    router.threshold = threshold
+    return threshold
+
+
+def evaluate(
+    router: QueryRouter, questions: List[dict], pinecone_config: PineconeConfig, top_k: int = 10
+) -> Dict[str, float]:
+    """
+    Routing accuracy against the namespaces of each question's expected sources.
+
+    Questions without expected sources (e.g. out-of-scope checks) are skipped.
+    """
+    scored = [q for q in questions if expected_namespaces(q, pinecone_config)]
+    exact = 0
+    namespace_recall = 0.0
+    calls = 0
+    narrowed = 0  # Routed to one namespace
+    narrowed_correctly = 0  # ... which was the only one expected
+    single_expected = 0  # Questions whose sources are all in one namespace
+    for question in scored:
+        expected = set(expected_namespaces(question, pinecone_config))
+        decision = router.route(question["question"], top_k)
+        routed = set(decision.namespaces)
+        exact += routed == expected
+        namespace_recall += len(routed & expected) / len(expected)
+        calls += len(routed)
+        single_expected += len(expected) == 1
+        if len(routed) == 1:
+            narrowed += 1
+            narrowed_correctly += routed == expected
+        logger.info(
+            f"  {question['id']}: routed {sorted(routed)} expected {sorted(expected)} "
+            f"shares {({n: round(s, 2) for n, s in decision.shares.items()})}"
+        )
+
+    n = len(scored) or 1
+    return {
+        "questions": len(scored),
+        "skipped": len(questions) - len(scored),
+        "accuracy": exact / n,
+        "namespace_recall": namespace_recall / n,
+        "calls_per_query": calls / n,
+        "baseline_calls_per_query": float(len(router.centroids)),
+        "threshold": router.threshold,
+        "narrowed": narrowed,
+        # None when undefined (nothing narrowed / no single-namespace questions)
+        "single_namespace_precision": narrowed_correctly / narrowed if narrowed else None,
+        "single_namespace_recall": narrowed_correctly / single_expected if single_expected else None,
+    }
+
+
+def _ratio(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0%}"
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build or evaluate the query router")
+    parser.add_argument("--evaluate", action="store_true", help="Report routing accuracy")
+    args = parser.parse_args()
+
+    try:
+        # Only namespace names are needed; no API key required
+        pinecone_config = PineconeConfig(api_key="")
+        path_config = get_path_config()
+        questions = load_evaluation_questions(path_config)
+        router = build_router(pinecone_config)
+        threshold = calibrate(router, questions, pinecone_config)
+        router.save(path_config.router_path)
+        logger.info(
+            f"Saved query router to {path_config.router_path} "
+            f"(single-namespace threshold {threshold:.3f})"
+        )
+
+        if args.evaluate:
+            # Calibrated on these same questions, so treat the results as an upper bound
+            summary = evaluate(router, questions, pinecone_config)
+            logger.info("=" * 60)
+            logger.info("Routing evaluation complete!")
+            logger.info(f"  Questions: {summary['questions']} (skipped {summary['skipped']} without sources)")
+            logger.info(f"  Exact namespace accuracy: {summary['accuracy']:.0%}")
+            logger.info(f"  Expected-namespace recall: {summary['namespace_recall']:.0%}")
+            logger.info(
+                f"  Vector calls per query: {summary['calls_per_query']:.2f} "
+                f"(baseline {summary['baseline_calls_per_query']:.0f})"
+            )
+            logger.info(
+                f"  Single-namespace routing: {summary['narrowed']} narrowed at threshold "
+                f"{summary['threshold']:.3f}, precision {_ratio(summary['single_namespace_precision'])}, "
+                f"recall {_ratio(summary['single_namespace_recall'])}"
+            )
+            logger.info("=" * 60)
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Rebuild the index behind an alias without touching the live version.
+
+Re-ingesting in place means queries see a half-old, half-new mix during the
+rebuild and compete with the upserts for throughput. Instead:
+
+1. Create a versioned shadow index (`<alias>-v<UTC timestamp>`)
+2. Ingest articles and threads into it concurrently, at full speed
+3. Validate: per-namespace record counts match what was upserted, and a
+   sample of evaluation questions returns hits from every namespace
+4. Atomically switch the alias in the registry (index_aliases.py)
+5. After a grace period for in-flight readers, delete the old version, if
+   it is one the registry tracked and this tooling named (`<alias>-v...`);
+   the legacy unversioned index is never deleted
+
+If validation fails, the alias is left alone and the shadow index is kept
+for inspection. In hierarchical mode each version gets its own parent-section
+docstore (docstore/<index version>.sqlite), switched and deleted with it.
+
+Usage:
+    python rebuild_index.py
+    python rebuild_index.py --keep-previous        # Skip garbage collection
+    python rebuild_index.py --alias kindred-rag-staging
+
+Environment variables required:
+    PINECONE_API_KEY (or VITE_PINECONE_API_KEY) - Your Pinecone API key
+    PINECONE_ALIAS_REGISTRY - Alias registry path (optional)
+"""
+
+import argparse
+import dataclasses
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from pinecone import Pinecone
+
+from config import (
+    get_pinecone_config,
+    get_path_config,
+    get_rebuild_config,
+    PineconeConfig,
+    RebuildConfig,
+)
+from corpus import load_evaluation_questions
+from index_aliases import AliasRegistry, is_version_of, version_name
+from ingest_articles import ArticleIngester
+from ingest_threads import ThreadIngester
+from pinecone_index import get_or_create_index, list_index_names, resolve_index_name, with_retries
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def ingest(shadow_config: PineconeConfig) -> Dict[str, int]:
+    """Ingest both content types into the shadow index; records upserted per namespace."""
+    path_config = get_path_config()
+    # Create the index once up front so the two ingesters don't race to create it
+    pc = Pinecone(api_key=shadow_config.api_key, host=shadow_config.controller_host)
+    get_or_create_index(pc, shadow_config, shadow_config.index_name)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        articles = executor.submit(ArticleIngester(shadow_config).run, path_config.articles_dir)
+        threads = executor.submit(ThreadIngester(shadow_config).run, path_config.threads_dir)
+        return {
+            shadow_config.articles_namespace: articles.result()["records_upserted"],
+            shadow_config.threads_namespace: threads.result()["records_upserted"],
+        }
+
+
+def wait_for_counts(index, expected: Dict[str, int], timeout_s: float) -> List[str]:
+    """
+    Poll index stats until every namespace holds its expected record count.
+
+    Returns:
+        Problems found (empty when the counts match)
+    """
+    deadline = time.monotonic() + timeout_s
+    while True:
+        namespaces = index.describe_index_stats().namespaces or {}
+        counts = {
+            namespace: namespaces[namespace].vector_count if namespace in namespaces else 0
+            for namespace in expected
+        }
+        problems = [
+            f"namespace '{namespace}' has {counts[namespace]} records, expected {count}"
+            for namespace, count in expected.items()
+            if counts[namespace] != count
+        ]
+        # Upserts become visible in stats with a short delay
+        if not problems or time.monotonic() >= deadline:
+            return problems
+        time.sleep(5)
+
+
+def check_sample_queries(
+    index,
+    namespaces: List[str],
+    questions: List[str],
+    query_vectors: Optional[List[List[float]]] = None,
+) -> List[str]:
+    """
+    Search each sample question in each namespace; every search must return hits.
+
+    Integrated indexes are searched with the question text. Dense (bulk-imported)
+    indexes need the questions' embeddings in query_vectors.
+    """
+    problems = []
+    for i, question in enumerate(questions):
+        for namespace in namespaces:
+            if query_vectors is None:
+                response = index.search(
+                    namespace=namespace, query={"inputs": {"text": question}, "top_k": 5}
+                )
+                hits = response.result.hits
+            else:
+                hits = index.query(namespace=namespace, vector=query_vectors[i], top_k=5).matches
+            if not hits:
+                problems.append(f"no hits in '{namespace}' for: {question[:60]}...")
+    return problems
+
+
+def rebuild(
+    pinecone_config: PineconeConfig,
+    rebuild_config: RebuildConfig,
+    keep_previous: bool = False,
+) -> Optional[str]:
+    """
+    Build, validate and switch to a new version of the alias's index.
+
+    Returns:
+        The new physical index name, or None if validation failed
+    """
+    alias = pinecone_config.index_alias
+    registry = AliasRegistry(pinecone_config.alias_registry_path)
+    pc = Pinecone(api_key=pinecone_config.api_key, host=pinecone_config.controller_host)
+    live = resolve_index_name(pc, pinecone_config)
+    shadow = version_name(alias)
+    shadow_config = dataclasses.replace(pinecone_config, index_version=shadow)
+    logger.info(f"Rebuilding alias '{alias}' (live: '{live}') into shadow index '{shadow}'")
+
+    expected = ingest(shadow_config)
+    index = pc.Index(shadow)
+
+    questions = [
+        q["question"] for q in load_evaluation_questions()[: rebuild_config.sample_queries]
+    ]
+    problems = wait_for_counts(index, expected, rebuild_config.count_timeout_s)
+    if not problems:
+        problems = check_sample_queries(index, list(expected), questions)
+    if problems:
+        for problem in problems:
+            logger.error(f"Validation failed: {problem}")
+        logger.error(f"Alias '{alias}' still points at '{live}'; shadow '{shadow}' kept for inspection")
+        return None
+    logger.info(f"Validated '{shadow}': counts {expected}, {len(questions)} sample queries")
+
+    previous = registry.switch(alias, shadow)
+    logger.info(f"Alias '{alias}' now points at '{shadow}' (was '{previous or live}')")
+
+    # Only versions this tooling created and the registry tracked are collected;
+    # before the first rebuild the alias named a legacy index, which is kept
+    old = previous
+    existing = list_index_names(pc)
+    if keep_previous or old is None or old == shadow or old not in existing:
+        return shadow
+    if not is_version_of(alias, old):
+        logger.info(f"Keeping '{old}': not a version created for alias '{alias}'")
+        return shadow
+    logger.info(f"Deleting '{old}' in {rebuild_config.gc_grace_s:.0f}s, after in-flight reads drain")
+    time.sleep(rebuild_config.gc_grace_s)
+    with_retries(lambda: pc.delete_index(old), "delete_index")
+    logger.info(f"Deleted old index '{old}'")
+    old_docstore = get_path_config().docstore_path(old)
+    if os.path.exists(old_docstore):
+        os.remove(old_docstore)
+        logger.info(f"Deleted its parent-section docstore {old_docstore}")
+    return shadow
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Shadow-index rebuild with alias cut-over")
+    parser.add_argument("--alias", default=None, help="Alias to rebuild (default: PineconeConfig.index_alias)")
+    parser.add_argument("--keep-previous", action="store_true", help="Don't delete the old version")
+    args = parser.parse_args()
+
+    try:
+        pinecone_config = get_pinecone_config()
+        if args.alias:
+            pinecone_config = dataclasses.replace(pinecone_config, index_alias=args.alias)
+
+        new_index = rebuild(pinecone_config, get_rebuild_config(), args.keep_previous)
+        if new_index is None:
+            sys.exit(1)
+
+        logger.info("=" * 60)
+        logger.info("Rebuild complete!")
+        logger.info(f"  Alias '{pinecone_config.index_alias}' -> '{new_index}'")
+        logger.info("=" * 60)
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Async retrieval service for the comparison frontend.
+
+An asyncio HTTP service (aiohttp) over the same index layout the ingesters
+write. It keeps one warm, pooled HTTP session to the vector backend,
+coalesces concurrent identical requests (single-flight), caches recent
+results briefly, and streams search results per namespace as they arrive.
+
+Endpoints:
+    GET  /health    Backend and cache/coalescing stats
+    POST /search    {"query", "top_k"?, "namespaces"?, "filter"?}
+                    -> NDJSON stream: one {"namespace", "hits"} line per namespace,
+                       then {"done": true}
+    POST /context   {"query", "top_k"?, "token_budget"?, "namespaces"?, "filter"?}
+                    -> {"context", "citations", "total_tokens"} via ContextAssembler
+
+Backends (RETRIEVAL_BACKEND):
+    pinecone  Search the hosted index the alias resolves to (default): query text
+              for integrated indexes, query vectors (embedded with Pinecone
+              inference) for dense bulk-imported indexes
+    local     LocalVectorIndex per namespace, query embedded with Pinecone inference
+
+Usage:
+    python retrieval_service.py
+    RETRIEVAL_BACKEND=local RETRIEVAL_SERVICE_PORT=9000 python retrieval_service.py
+
+Environment variables required:
+    PINECONE_API_KEY (or VITE_PINECONE_API_KEY) - Your Pinecone API key
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from config import (
+    get_pinecone_config,
+    get_path_config,
+    get_service_config,
+    get_local_index_config,
+    PineconeConfig,
+    PathConfig,
+    ServiceConfig,
+)
+from context_assembly import ContextAssembler
+from docstore import SectionDocstore
+from local_index import LocalVectorIndex
+from metadata_index import validate_filter
+from parent_retrieval import resolve_parents
+from query_router import QueryRouter
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTROLLER_HOST = "https://api.pinecone.io"
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one in-flight task."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() unless a call with the same key is in flight; then share its result."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one caller disconnecting doesn't cancel the shared work
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def _normalize_host(host: str) -> str:
+    """Ensure a host has a scheme, as Pinecone returns bare hostnames."""
+    host = host.rstrip("/")
+    if host.startswith("http://") or host.startswith("https://"):
+        return host
+    return f"https://{host}"
+
+
+def _pooled_session(
+    pinecone_config: PineconeConfig, service_config: ServiceConfig
+) -> aiohttp.ClientSession:
+    """One keep-alive connection pool to Pinecone, shared by every request."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=service_config.max_connections, keepalive_timeout=60
+        ),
+        headers={
+            "Api-Key": pinecone_config.api_key,
+            "X-Pinecone-API-Version": service_config.api_version,
+        },
+        timeout=aiohttp.ClientTimeout(total=30),
+    )
+
+
+async def _embed_query(
+    session: aiohttp.ClientSession, config: PineconeConfig, query: str
+) -> List[float]:
+    """Embed a query with Pinecone inference (same model as the integrated index)."""
+    controller = _normalize_host(config.controller_host or DEFAULT_CONTROLLER_HOST)
+    body = {
+        "model": config.embedding_model,
+        "parameters": {"input_type": "query", "truncate": "END"},
+        "inputs": [{"text": query}],
+    }
+    async with session.post(f"{controller}/embed", json=body) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+    return data["data"][0]["values"]
+
+
+class PineconeSearchBackend:
+    """Integrated-embedding search against the hosted index over a pooled session."""
+
+    def __init__(self, pinecone_config: PineconeConfig, service_config: ServiceConfig):
+        self.config = pinecone_config
+        self.service_config = service_config
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.index_name = ""
+        self.index_host = ""
+        self.integrated = True  # False for dense (bulk-imported) indexes
+        self.resolved_at = 0.0
+        self.resolve_lock = asyncio.Lock()
+        self.embed_flight = SingleFlight()
+        self.calls = 0  # Searches sent to the index
+
+    async def start(self) -> None:
+        self.session = _pooled_session(self.config, self.service_config)
+        await self._resolve_index()
+
+    async def _resolve_index(self) -> None:
+        """Look up the alias's current index and its host, following alias switches."""
+        async with self.resolve_lock:
+            if self.index_host and time.monotonic() - self.resolved_at < self.service_config.alias_refresh_s:
+                return  # Another request refreshed it while this one waited
+            self.resolved_at = time.monotonic()
+            controller = _normalize_host(self.config.controller_host or DEFAULT_CONTROLLER_HOST)
+            index_name = self.config.index_name
+            if index_name == self.config.index_alias:
+                # Unregistered alias: make sure the registry isn't just missing
+                async with self.session.get(f"{controller}/indexes") as resp:
+                    resp.raise_for_status()
+                    existing = [idx["name"] for idx in (await resp.json()).get("indexes", [])]
+                try:
+                    index_name = self.config.resolve_index_name(existing)
+                except EnvironmentError as e:
+                    if not self.index_name:
+                        raise
+                    logger.error(f"{e}; still searching '{self.index_name}'")
+                    return
+            if index_name == self.index_name:
+                return
+            async with self.session.get(f"{controller}/indexes/{index_name}") as resp:
+                resp.raise_for_status()
+                description = await resp.json()
+            self.index_name = index_name
+            self.index_host = _normalize_host(description["host"])
+            self.integrated = bool(description.get("embed"))
+            logger.info(
+                f"Searching {'integrated' if self.integrated else 'dense'} index "
+                f"'{index_name}' at {self.index_host}"
+            )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def search(
+        self, namespace: str, query: str, top_k: int, filter: Optional[dict]
+    ) -> List[dict]:
+        self.calls += 1
+        if time.monotonic() - self.resolved_at >= self.service_config.alias_refresh_s:
+            await self._resolve_index()
+        if not self.integrated:
+            return await self._query_by_vector(namespace, query, top_k, filter)
+        body: Dict[str, Any] = {"query": {"inputs": {"text": query}, "top_k": top_k}}
+        if filter:
+            body["query"]["filter"] = filter
+        url = f"{self.index_host}/records/namespaces/{namespace}/search"
+        async with self.session.post(url, json=body) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return data.get("result", {}).get("hits", [])
+
+    async def _query_by_vector(
+        self, namespace: str, query: str, top_k: int, filter: Optional[dict]
+    ) -> List[dict]:
+        """Dense indexes: embed the query, query by vector, return search-shaped hits."""
+        # Every namespace searched for a query shares one embedding call
+        vector = await self.embed_flight.do(
+            query, lambda: _embed_query(self.session, self.config, query)
+        )
+        body: Dict[str, Any] = {
+            "namespace": namespace, "vector": vector, "topK": top_k, "includeMetadata": True,
+        }
+        if filter:
+            body["filter"] = filter
+        async with self.session.post(f"{self.index_host}/query", json=body) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return [
+            {"_id": match["id"], "_score": match.get("score", 0.0), "fields": match.get("metadata") or {}}
+            for match in data.get("matches", [])
+        ]
+
+
+class LocalSearchBackend:
+    """Search LocalVectorIndex directories, embedding queries with Pinecone inference."""
+
+    def __init__(
+        self,
+        pinecone_config: PineconeConfig,
+        service_config: ServiceConfig,
+        path_config: PathConfig,
+    ):
+        self.config = pinecone_config
+        self.service_config = service_config
+        self.path_config = path_config
+        self.local_config = get_local_index_config()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.indexes: Dict[str, LocalVectorIndex] = {}
+        self.embed_flight = SingleFlight()
+        self.calls = 0  # Searches run against the local indexes
+        self.index_name = "local"  # Local indexes aren't versioned behind the alias
+
+    async def start(self) -> None:
+        for namespace in (self.config.articles_namespace, self.config.threads_namespace):
+            path = os.path.join(self.path_config.local_index_dir, namespace)
+            self.indexes[namespace] = LocalVectorIndex.open(path)
+            logger.info(f"Opened local index '{namespace}' ({len(self.indexes[namespace])} vectors)")
+
+        self.session = _pooled_session(self.config, self.service_config)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def search(
+        self, namespace: str, query: str, top_k: int, filter: Optional[dict]
+    ) -> List[dict]:
+        index = self.indexes.get(namespace)
+        if index is None:
+            raise web.HTTPBadRequest(reason=f"Unknown namespace '{namespace}'")
+        self.calls += 1
+        # Every namespace searched for a query shares one embedding call
+        vector = await self.embed_flight.do(
+            query, lambda: _embed_query(self.session, self.config, query)
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: index.search(
+                vector,
+                top_k=top_k,
+                rescore_multiplier=self.local_config.rescore_multiplier,
+                filter=filter,
+            ),
+        )
+
+
+def _bounded_int(body: dict, field: str, default: int, maximum: int) -> int:
+    """A positive int request field no larger than maximum; HTTP 400 otherwise."""
+    value = body.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= maximum:
+        raise web.HTTPBadRequest(reason=f"'{field}' must be an integer from 1 to {maximum}")
+    return value
+
+
+class RetrievalService:
+    """HTTP handlers plus the single-flight and cache layers in front of the backend."""
+
+    def __init__(
+        self,
+        backend,
+        pinecone_config: PineconeConfig,
+        service_config: ServiceConfig,
+        router: Optional[QueryRouter] = None,
+        path_config: Optional[PathConfig] = None,
+    ):
+        self.backend = backend
+        self.config = pinecone_config
+        self.service_config = service_config
+        self.router = router
+        self.path_config = path_config or get_path_config()
+        # Parent sections for hierarchical-mode hits, per index version
+        self.docstore: Optional[SectionDocstore] = None
+        self.docstore_index = ""
+        self.docstore_readers: Dict[SectionDocstore, int] = {}
+        self.docstore_lock = threading.Lock()
+        self.flight = SingleFlight()
+        self.cache = TTLCache(service_config.cache_size, service_config.cache_ttl_s)
+        self.assembler = ContextAssembler()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._cors])
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/search", self.search)
+        app.router.add_post("/context", self.context)
+        app.on_startup.append(lambda _: self.backend.start())
+        app.on_cleanup.append(lambda _: self.backend.close())
+        return app
+
+    @web.middleware
+    async def _cors(self, request: web.Request, handler):
+        # The React app calls the service straight from the browser
+        if request.method == "OPTIONS":
+            response = web.Response()
+        else:
+            response = await handler(request)
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+        response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+        return response
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "backend": self.service_config.backend,
+            "requests": self.flight.calls,
+            "coalesced": self.flight.coalesced,
+            "backend_calls": self.backend.calls,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "routing": self.router is not None,
+        })
+
+    async def _parse(self, request: web.Request) -> dict:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise web.HTTPBadRequest(reason="Request body must be JSON")
+        if not isinstance(body, dict) or not isinstance(body.get("query"), str) or not body["query"].strip():
+            raise web.HTTPBadRequest(reason="'query' is required")
+        query = body["query"].strip()
+        top_k = _bounded_int(
+            body, "top_k", self.service_config.default_top_k, self.service_config.max_top_k
+        )
+        token_budget = _bounded_int(
+            body, "token_budget",
+            self.service_config.default_token_budget, self.service_config.max_token_budget,
+        )
+        filter = body.get("filter")
+        if filter is not None:
+            # Reject malformed filters up front, before /search starts streaming
+            try:
+                validate_filter(filter)
+            except ValueError as e:
+                raise web.HTTPBadRequest(reason=f"Invalid 'filter': {e}")
+
+        known = (self.config.articles_namespace, self.config.threads_namespace)
+        namespaces = body.get("namespaces")
+        if namespaces is not None:
+            if (
+                not isinstance(namespaces, list)
+                or not namespaces
+                or any(namespace not in known for namespace in namespaces)
+            ):
+                raise web.HTTPBadRequest(
+                    reason=f"'namespaces' must be a non-empty list of {', '.join(known)}"
+                )
+            top_k_by_namespace = {namespace: top_k for namespace in namespaces}
+        elif self.router is not None:
+            # Search only the namespaces the query wants, splitting top_k between them
+            top_k_by_namespace = self.router.route(query, top_k).top_k
+        else:
+            top_k_by_namespace = {namespace: top_k for namespace in known}
+        return {
+            "query": query,
+            "top_k": top_k_by_namespace,
+            "filter": filter,
+            "token_budget": token_budget,
+        }
+
+    async def _search_namespace(
+        self, namespace: str, query: str, top_k: int, filter: Optional[dict]
+    ) -> List[dict]:
+        """Cached, coalesced search of one namespace."""
+        # Keyed by index version, so an alias switch doesn't serve the old index's hits
+        key = json.dumps(
+            ["search", self.backend.index_name, namespace, query, top_k, filter], sort_keys=True
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def run():
+            hits = await self.backend.search(namespace, query, top_k, filter)
+            self.cache.put(key, hits)
+            return hits
+
+        return await self.flight.do(key, run)
+
+    async def search(self, request: web.Request) -> web.StreamResponse:
+        params = await self._parse(request)
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def search_one(namespace: str, top_k: int):
+            try:
+                hits = await self._search_namespace(
+                    namespace, params["query"], top_k, params["filter"]
+                )
+                return {"namespace": namespace, "hits": hits}
+            except Exception as e:
+                return {"namespace": namespace, "error": str(e)}
+
+        # Stream each namespace as soon as its results are ready
+        searches = [search_one(ns, top_k) for ns, top_k in params["top_k"].items()]
+        for finished in asyncio.as_completed(searches):
+            line = await finished
+            await response.write((json.dumps(line) + "\n").encode("utf-8"))
+
+        await response.write(b'{"done": true}\n')
+        await response.write_eof()
+        return response
+
+    @contextmanager
+    def _docstore_for(self, index_name: str) -> Iterator[Optional[SectionDocstore]]:
+        """
+        Borrow the docstore written alongside index_name, reopened when the alias moves.
+
+        A missing docstore isn't remembered, so one written after the alias
+        moved is picked up by the next request. A replaced docstore is closed
+        once its last reader has returned it.
+        """
+        docstore = self._acquire_docstore(index_name)
+        try:
+            yield docstore
+        finally:
+            if docstore is not None:
+                self._release_docstore(docstore)
+
+    def _acquire_docstore(self, index_name: str) -> Optional[SectionDocstore]:
+        with self.docstore_lock:
+            if index_name != self.docstore_index:
+                path = self.path_config.docstore_path(index_name)
+                if not os.path.exists(path):
+                    return None
+                previous = self.docstore
+                self.docstore = SectionDocstore(path)
+                self.docstore_index = index_name
+                logger.info(f"Resolving parent sections from {path}")
+                if previous is not None and not self.docstore_readers.get(previous):
+                    previous.close()
+            self.docstore_readers[self.docstore] = self.docstore_readers.get(self.docstore, 0) + 1
+            return self.docstore
+
+    def _release_docstore(self, docstore: SectionDocstore) -> None:
+        with self.docstore_lock:
+            self.docstore_readers[docstore] -= 1
+            if self.docstore_readers[docstore] == 0:
+                del self.docstore_readers[docstore]
+                if docstore is not self.docstore:
+                    docstore.close()  # Replaced while in use; this was its last reader
+
+    def _assemble(self, hits: List[dict], token_budget: int, index_name: str):
+        """Swap child-chunk hits for their parent sections, then pack the budget."""
+        if any(hit.get("fields", {}).get("parent_id") for hit in hits):
+            with self._docstore_for(index_name) as docstore:
+                if docstore is None:
+                    logger.warning(f"Hits reference parent sections but '{index_name}' has no docstore")
+                else:
+                    hits = resolve_parents(hits, docstore)
+        return self.assembler.assemble(hits, token_budget)
+
+    async def context(self, request: web.Request) -> web.Response:
+        params = await self._parse(request)
+        key = json.dumps(["context", self.backend.index_name, params], sort_keys=True)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return web.json_response(cached)
+
+        async def run():
+            results = await asyncio.gather(*[
+                self._search_namespace(ns, params["query"], top_k, params["filter"])
+                for ns, top_k in params["top_k"].items()
+            ])
+            hits = [hit for namespace_hits in results for hit in namespace_hits]
+            loop = asyncio.get_running_loop()
+            assembled = await loop.run_in_executor(
+                None, self._assemble, hits, params["token_budget"], self.backend.index_name
+            )
+            payload = {
+                "context": assembled.to_prompt(),
+                "citations": assembled.citations,
+                "total_tokens": assembled.total_tokens,
+            }
+            self.cache.put(key, payload)
+            return payload
+
+        return web.json_response(await self.flight.do(key, run))
+
+
+def create_service(
+    pinecone_config: PineconeConfig,
+    service_config: ServiceConfig,
+    path_config: Optional[PathConfig] = None,
+) -> RetrievalService:
+    """Build the service with the configured backend."""
+    path_config = path_config or get_path_config()
+    if service_config.backend == "local":
+        backend = LocalSearchBackend(pinecone_config, service_config, path_config)
+    elif service_config.backend == "pinecone":
+        backend = PineconeSearchBackend(pinecone_config, service_config)
+    else:
+        raise EnvironmentError(
+            f"Unknown RETRIEVAL_BACKEND '{service_config.backend}'. Expected 'pinecone' or 'local'"
+        )
+
+    router = None
+    router_path = path_config.router_path
+    if service_config.route_queries and os.path.exists(router_path):
+        router = QueryRouter.load(router_path)
+        logger.info(f"Routing queries with {router_path}")
+    return RetrievalService(backend, pinecone_config, service_config, router, path_config)
+
+
+def main():
+    """Main entry point."""
+    try:
+        pinecone_config = get_pinecone_config()
+        service_config = get_service_config()
+        service = create_service(pinecone_config, service_config)
+        logger.info(
+            f"Starting retrieval service on http://{service_config.host}:{service_config.port} "
+            f"(backend: {service_config.backend})"
+        )
+        web.run_app(
+            service.build_app(),
+            host=service_config.host,
+            port=service_config.port,
+            print=None,
+        )
+
+    except EnvironmentError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        logger.error(f"File error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Boundary tests for ArticleChunker._chunk_section.
+
+Tokens are counted as whitespace-separated words so the sizes below are
+exact and no tiktoken encoding download is needed.
+
+Run with:
+    python -m pytest test_chunking.py
+"""
+
+from typing import List
+
+from chunking import ArticleChunker
+from config import ChunkingConfig
+
+
+class WordCounter:
+    """TokenCounter stand-in: one token per word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def make_chunker(**overrides) -> ArticleChunker:
+    config = ChunkingConfig(
+        target_chunk_size=550, min_chunk_size=400, max_chunk_size=700, overlap_tokens=100
+    )
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return ArticleChunker(config, token_counter=WordCounter())
+
+
+def paragraph(index: int, tokens: int) -> str:
+    return " ".join(f"p{index}w{i}" for i in range(tokens))
+
+
+def section(sizes: List[int]) -> str:
+    return "\n\n".join(paragraph(i, size) for i, size in enumerate(sizes))
+
+
+def chunk(chunker: ArticleChunker, text: str):
+    return chunker._chunk_section(text, "Section", "Title", "https://example.org/a", "a.md")
+
+
+def paragraphs_of(chunk_text: str) -> List[int]:
+    """Indexes of the paragraphs a chunk holds."""
+    return [int(para.split("w", 1)[0][1:]) for para in chunk_text.split("\n\n")]
+
+
+def test_section_at_max_stays_one_chunk():
+    chunks = chunk(make_chunker(), section([100] * 7))
+    assert [c.token_count for c in chunks] == [700]
+    assert chunks[0].chunk_index == 0
+
+
+def test_section_over_max_closes_at_first_boundary_past_target():
+    chunks = chunk(make_chunker(), section([100] * 8))
+    # Closes at 600 (first paragraph boundary >= 550), not at 700
+    assert [c.token_count for c in chunks] == [600, 300]
+    # The second chunk starts with the last paragraph of the first as overlap
+    assert paragraphs_of(chunks[0].text) == [0, 1, 2, 3, 4, 5]
+    assert paragraphs_of(chunks[1].text) == [5, 6, 7]
+
+
+def test_chunk_reaching_target_exactly_closes():
+    chunks = chunk(make_chunker(), section([550, 200]))
+    assert [c.token_count for c in chunks] == [550, 200]
+
+
+def test_chunk_closes_before_passing_max():
+    chunks = chunk(make_chunker(), section([500, 250]))
+    # 500 is under target, but adding 250 would pass max
+    assert [c.token_count for c in chunks] == [500, 250]
+    assert all(c.token_count <= 700 for c in chunks)
+
+
+def test_short_tail_folds_into_previous_chunk_when_it_fits():
+    chunks = chunk(make_chunker(), section([100] * 12))
+    # Third chunk would be p10 (overlap) + p11: its new text (100) is under
+    # min, and p5..p11 is exactly max, so it is folded in
+    assert [c.token_count for c in chunks] == [600, 700]
+    assert paragraphs_of(chunks[1].text) == [5, 6, 7, 8, 9, 10, 11]
+
+
+def test_short_tail_kept_when_folding_would_pass_max():
+    chunks = chunk(make_chunker(), section([100] * 13))
+    assert [c.token_count for c in chunks] == [600, 600, 300]
+
+
+def test_chunk_ids_are_positional():
+    chunker = make_chunker()
+    first = chunk(chunker, section([100] * 8))
+    resized = chunk(make_chunker(target_chunk_size=700), section([100] * 8))
+    # Different boundaries, same IDs: resizing needs a rebuild, not an in-place re-ingest
+    assert [c.chunk_id for c in first] == [c.chunk_id for c in resized]
+    assert first[0].text != resized[0].text
+    assert [c.chunk_index for c in first] == [0, 1]